@@ -1,15 +1,31 @@
 # app.py
 import streamlit as st
 
-# Try importing deep-translator safely
-try:
-    from deep_translator import GoogleTranslator, LibreTranslator
-    DEEP_TRANSLATOR_AVAILABLE = True
-except Exception as e:
-    DEEP_TRANSLATOR_AVAILABLE = False
-
 import pandas as pd
 import io
+import time
+import uuid
+from pathlib import Path
+
+import async_engine
+import metrics
+from translator import (
+    BATCH_WORKERS,
+    breakers,
+    concurrency,
+    hot_cache,
+    latencies,
+    memory,
+    translate_batch,
+    translate_column,
+    stream_output,
+    translate_csv_stream,
+    translate_document,
+    translate_text,
+)
+
+# Scrape endpoint for the whole process; later reruns find it already up
+metrics.serve()
 
 st.set_page_config(page_title="Translator App", layout="wide")
 st.title("🌐 Simple Translator App")
@@ -28,35 +44,65 @@ LANGS = {
 }
 
 # ---------------- Helper -----------------
-def translate_text(text, src, tgt):
-    if not DEEP_TRANSLATOR_AVAILABLE:
-        return "❌ deep-translator package not installed. Check requirements.txt"
-
-    if not text.strip():
-        return ""
-
-    # Try Google first
-    try:
-        tr = GoogleTranslator(source=src, target=tgt)
-        return tr.translate(text)
-    except:
-        pass
-
-    # Fallback to Libre
-    try:
-        tr = LibreTranslator(source=src, target=tgt)
-        return tr.translate(text)
-    except:
-        return "❌ Translation failed. Try again later."
+def column_summary(stats):
+    rows = stats["rows"]
+    return (
+        f"Translated {stats['unique']} unique values for {rows} rows, "
+        f"{stats['skipped']} cells copied through unchanged "
+        f"({1 - stats['unique'] / rows:.0%} fewer backend calls)"
+    )
 
 # ---------------- UI -----------------
 src_lang = st.selectbox("Source Language", list(LANGS.keys()))
 tgt_lang = st.selectbox("Target Language", [k for k in LANGS.keys() if k != "Auto-detect"])
 
+with st.sidebar:
+    st.subheader("Performance")
+    workers = st.slider(
+        "Max concurrent requests",
+        min_value=1,
+        max_value=32,
+        value=BATCH_WORKERS,
+        help="File translation adapts its concurrency up to this ceiling.",
+    )
+    st.caption(f"Adaptive concurrency: {int(concurrency.limit)} (in flight: {concurrency.in_flight})")
+    events = concurrency.history()
+    if events:
+        with st.expander("Concurrency changes"):
+            for at, limit, reason in reversed(events):
+                st.caption(f"{time.strftime('%H:%M:%S', time.localtime(at))} → {limit} ({reason})")
+    engines = ["Threads"] + (["Async (HTTP/2)"] if async_engine.HTTPX_AVAILABLE else [])
+    engine = st.radio("File translation engine", engines, horizontal=True)
+    batch = async_engine.translate_many if engine != "Threads" else translate_batch
+    hedge = st.checkbox(
+        "Hedge interactive requests",
+        help="If the first backend is slower than usual, also ask the next one and use whichever answers first.",
+    )
+
+    st.subheader("Backends")
+    for name, breaker in breakers.items():
+        p50, p95 = latencies[name].percentile(50), latencies[name].percentile(95)
+        timing = f" · p50 {p50 * 1000:.0f} ms · p95 {p95 * 1000:.0f} ms" if p50 is not None else ""
+        st.caption(
+            f"{name}: {breaker.state} · {breaker.error_rate_now():.0%} errors (last {breaker.window:.0f}s){timing}"
+        )
+
+    st.subheader("Cache")
+    hot_stats = hot_cache.stats()
+    st.caption(
+        f"In memory: {hot_stats['entries']} entries · {hot_stats['bytes'] / 1024:.0f} KiB · "
+        f"{hot_stats['hit_rate']:.0%} hit rate"
+    )
+    tm_stats = memory.stats()
+    st.caption(
+        f"On disk: {tm_stats['entries']} entries · {tm_stats['hits']} hits · "
+        f"{tm_stats['misses']} misses · {tm_stats['hit_rate']:.0%} hit rate"
+    )
+
 text = st.text_area("Enter text to translate")
 
 if st.button("Translate"):
-    result = translate_text(text, LANGS[src_lang], LANGS[tgt_lang])
+    result = translate_text(text, LANGS[src_lang], LANGS[tgt_lang], hedge=hedge)
     st.text_area("Translation", value=result, height=200)
 
 # ---------------- File Upload -----------------
@@ -72,18 +118,47 @@ if file:
         st.text_area("File", value=data, height=200)
 
         if st.button("Translate File"):
-            translated = translate_text(data, LANGS[src_lang], LANGS[tgt_lang])
+            translated = translate_document(
+                data, LANGS[src_lang], LANGS[tgt_lang], workers=workers, batch=batch
+            )
             st.download_button("Download Translation", translated, "translated.txt")
 
     else:
-        df = pd.read_csv(file)
+        stream = st.checkbox(
+            "Stream in chunks (large files)",
+            help="Translate the CSV a chunk of rows at a time and write the result to disk.",
+        )
+        if stream:
+            df = pd.read_csv(file, nrows=5)
+            file.seek(0)
+        else:
+            df = pd.read_csv(file)
         st.write(df.head())
 
         col = st.selectbox("Select column to translate", df.columns)
 
         if st.button("Translate Column"):
-            df[f"{col}_translated"] = df[col].astype(str).apply(
-                lambda x: translate_text(x, LANGS[src_lang], LANGS[tgt_lang])
-            )
-            st.write(df.head())
-            st.download_button("Download CSV", df.to_csv(index=False), "translated.csv")
+            if stream:
+                # Replaces this session's previous streamed result, if any
+                path = stream_output(st.session_state.setdefault("stream_id", uuid.uuid4().hex))
+                progress = st.empty()
+                stats = None
+                with open(path, "w", encoding="utf-8", newline="") as out:
+                    for stats in translate_csv_stream(
+                        file, col, LANGS[src_lang], LANGS[tgt_lang], out, workers=workers, batch=batch
+                    ):
+                        progress.caption(f"{stats['rows']} rows translated…")
+                if stats and stats["rows"]:
+                    progress.caption(column_summary(stats))
+                # The file is read from disk only when the download is clicked
+                st.download_button(
+                    "Download CSV", Path(out.name).read_bytes, "translated.csv", mime="text/csv"
+                )
+            else:
+                df[f"{col}_translated"], stats = translate_column(
+                    df[col], LANGS[src_lang], LANGS[tgt_lang], workers=workers, batch=batch
+                )
+                if stats["rows"]:
+                    st.caption(column_summary(stats))
+                st.write(df.head())
+                st.download_button("Download CSV", df.to_csv(index=False), "translated.csv")
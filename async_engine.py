@@ -0,0 +1,288 @@
+# async_engine.py
+import asyncio
+import os
+import threading
+import time
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except Exception as e:
+    HTTPX_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401 - httpx only speaks HTTP/2 when h2 is installed
+    HTTP2_AVAILABLE = True
+except Exception as e:
+    HTTP2_AVAILABLE = False
+
+from backends import CLIENTS, HTTP_TIMEOUT, BackendError, RateLimited, capable
+from detect import resolve_source
+from health import by_health, route
+from metrics import failed_texts, fallbacks, observe_call, queue_depth
+from ratelimit import backoff_delay
+from translator import (
+    BACKEND_CONCURRENCY,
+    BACKENDS,
+    BATCH_SEPARATOR,
+    FAILED,
+    RATE_LIMITS,
+    RETRY_ATTEMPTS,
+    _pack,
+    batch_limit,
+    breakers,
+    cassette,
+    latencies,
+    limiter,
+    lookup,
+    payload_limit,
+    remember,
+)
+
+ASYNC_MAX_IN_FLIGHT = int(os.environ.get("TRANSLATOR_ASYNC_MAX_IN_FLIGHT", "256"))
+
+
+class AsyncEngine:
+    """asyncio counterpart of translate_text / translate_batch.
+
+    Requests go through one httpx.AsyncClient per event loop, which keeps
+    connections alive and multiplexes over HTTP/2 where the backend offers
+    it, so thousands of in-flight segments cost no threads. Batches are
+    packed into as few requests as translate_batch sends, and each backend
+    keeps its TRANSLATOR_<BACKEND>_CONCURRENCY cap on in-flight requests,
+    under the engine-wide max_in_flight. Async code can
+    await the coroutines directly; synchronous callers use run(), which
+    executes them on the engine's own background loop.
+    """
+
+    def __init__(self, max_in_flight=ASYNC_MAX_IN_FLIGHT, http2=HTTP2_AVAILABLE):
+        self.max_in_flight = max_in_flight
+        self.http2 = http2
+        self._loop = None
+        self._http = {}
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def run(self, coro):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="async-engine", daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def _connection(self):
+        loop = asyncio.get_running_loop()
+        state = self._http.get(loop)
+        if state is None:
+            transport = httpx.AsyncHTTPTransport(
+                http2=self.http2,
+                limits=httpx.Limits(max_connections=self.max_in_flight),
+            )
+            if cassette:
+                transport = cassette.async_transport(transport)
+            http = httpx.AsyncClient(transport=transport, timeout=HTTP_TIMEOUT)
+            slots = {backend: asyncio.Semaphore(n) for backend, n in BACKEND_CONCURRENCY.items()}
+            state = self._http[loop] = (http, asyncio.Semaphore(self.max_in_flight), slots)
+        return state
+
+    def _client(self, backend, src, tgt):
+        key = (backend, src, tgt)
+        if key not in self._clients:
+            # Only request() and parse() (or an in-process translate()) are used, so no session is needed
+            self._clients[key] = CLIENTS[backend](src, tgt, None)
+        return self._clients[key]
+
+    async def _call(self, backend, text, src, tgt):
+        """One request to one backend, through its breaker, rate limiter and concurrency cap.
+
+        ``text`` may also be a list of single-line texts, sent as one request
+        like the client's translate_many().
+        """
+        breaker = breakers[backend]
+        if not breaker.allow():
+            raise BackendError(f"{backend}: circuit open")
+        bucket = limiter.bucket(backend, src, tgt)
+        await asyncio.sleep(bucket.reserve())
+        client = self._client(backend, src, tgt)
+        http, in_flight, slots = self._connection()
+        start = time.monotonic()
+        try:
+            async with slots[backend]:
+                if client.http:
+                    async with in_flight:
+                        result = await self._send(http, client, text)
+                else:
+                    work = client.translate_many if isinstance(text, list) else client.translate
+                    result = await asyncio.to_thread(work, text)
+        except Exception as e:
+            observe_call(backend, text, time.monotonic() - start, error=e)
+            if isinstance(e, RateLimited) or (getattr(e, "status", None) or 0) >= 500:
+                bucket.throttled(e.retry_after)
+            breaker.record(False)
+            raise
+        elapsed = time.monotonic() - start
+        observe_call(backend, text, elapsed)
+        bucket.succeeded()
+        breaker.record(True)
+        latencies[backend].record(elapsed)
+        return result
+
+    @staticmethod
+    async def _send(http, client, text):
+        if not isinstance(text, list):
+            return client.parse(await http.request(**client.request(text)))
+        if client.batch:
+            return client.parse_many(await http.request(**client.request_many(text)), len(text))
+        # One per line, as HTTPClient.translate_many() packs them
+        parts = client.parse(await http.request(**client.request(BATCH_SEPARATOR.join(text))))
+        parts = parts.split(BATCH_SEPARATOR)
+        return parts if len(parts) == len(text) else None
+
+    async def _call_backends(self, text, src, tgt):
+        """(backend, result) from the first backend that answers; None if none did."""
+        # The engine only serves batch work, so spread it across backends,
+        # except under a cassette where a replay must ask the recorded backends
+        backends = capable(BACKENDS, src, tgt)
+        if cassette:
+            order = by_health(backends, breakers)
+            first = backends[0]
+        else:
+            order = route(backends, breakers, latencies, BACKEND_CONCURRENCY, RATE_LIMITS)
+            first = order[0]
+        for backend in order:
+            try:
+                result = await self._call(backend, text, src, tgt)
+            except Exception:
+                # Counted by exception type in _call; the next backend takes over
+                continue
+            if backend != first:
+                fallbacks.labels(first, backend).inc()
+            return backend, result
+        return None
+
+    async def _translate_uncached(self, text, src, tgt):
+        answer = await self._call_backends(text, src, tgt)
+        if answer is None:
+            return None
+        backend, result = answer
+        if result:
+            remember(text, src, tgt, backend, result)
+        return result
+
+    async def _translate_packed(self, batch, src, tgt):
+        """Translate a packed batch in one request; None if it failed or did not split back apart."""
+        answer = await self._call_backends(batch, src, tgt)
+        if answer is None or answer[1] is None:
+            return None
+        backend, parts = answer
+        for text, part in zip(batch, parts):
+            if part.strip():
+                remember(text, src, tgt, backend, part)
+        return parts
+
+    async def translate(self, text, src, tgt, attempts=1):
+        """Translate one string; failures are retried with backoff up to ``attempts`` times."""
+        if not text.strip():
+            return ""
+        src = resolve_source(text, src)
+        if src == tgt:
+            return text.strip()
+
+        cached = lookup(text, src, tgt)
+        if cached is not None:
+            return cached
+
+        for attempt in range(attempts):
+            if attempt:
+                reopen = min(breaker.retry_in() for breaker in breakers.values())
+                await asyncio.sleep(max(backoff_delay(attempt - 1), reopen))
+            result = await self._translate_uncached(text, src, tgt)
+            if result is not None:
+                return result
+        failed_texts.labels("async").inc()
+        return FAILED
+
+    async def translate_many(self, texts, src, tgt, limit=None):
+        """Translate a list of strings concurrently, at most ``limit`` requests at a time.
+
+        Like translate_batch, short single-line segments are packed into as
+        few requests as the backends accept, and segments that fail or do not
+        split back apart are retried one at a time for up to RETRY_ATTEMPTS
+        rounds before they come back as failures.
+        """
+        if src == "auto":
+            # Detect locally and batch each language on its own, as translate_batch does
+            groups = {}
+            for i, text in enumerate(texts):
+                groups.setdefault(resolve_source(text, src), []).append(i)
+            if list(groups) != ["auto"]:
+                results = [None] * len(texts)
+                languages = list(groups)
+                translated = await asyncio.gather(
+                    *(self.translate_many([texts[i] for i in groups[lang]], lang, tgt, limit) for lang in languages)
+                )
+                for lang, parts in zip(languages, translated):
+                    for i, result in zip(groups[lang], parts):
+                        results[i] = result
+                return results
+
+        gate = asyncio.Semaphore(limit) if limit else None
+
+        async def gated(coro):
+            if gate is None:
+                return await coro
+            async with gate:
+                return await coro
+
+        results = [None] * len(texts)
+        pending = {}
+        for i, text in enumerate(texts):
+            if not text.strip():
+                results[i] = ""
+            elif src == tgt:
+                results[i] = text.strip()
+            elif (cached := lookup(text, src, tgt)) is not None:
+                results[i] = cached
+            else:
+                pending.setdefault(text, []).append(i)
+
+        # Multi-line or oversized segments cannot share a request
+        size = payload_limit(src, tgt)
+        packable = [t for t in pending if BATCH_SEPARATOR not in t.strip() and len(t) < size]
+        batches = list(_pack(packable, size, batch_limit(src, tgt)))
+        done = {}
+        queue_depth.inc(len(pending))
+        try:
+            packed = await asyncio.gather(
+                *(gated(self._translate_packed([t.strip() for t in b], src, tgt)) for b in batches)
+            )
+            for batch, parts in zip(batches, packed):
+                if parts is not None:
+                    done.update(zip(batch, parts))
+                    queue_depth.dec(len(batch))
+
+            async def one(text):
+                done[text] = await gated(self.translate(text, src, tgt, attempts=RETRY_ATTEMPTS))
+                queue_depth.dec()
+
+            await asyncio.gather(*(one(t) for t in pending if t not in done))
+        finally:
+            queue_depth.dec(len(pending) - len(done))
+
+        for text, positions in pending.items():
+            for i in positions:
+                results[i] = done[text]
+        return results
+
+    async def aclose(self):
+        state = self._http.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state[0].aclose()
+
+
+engine = AsyncEngine() if HTTPX_AVAILABLE else None
+
+
+def translate_many(texts, src, tgt, workers=None):
+    """Drop-in for translate_batch that runs on the shared async engine."""
+    return engine.run(engine.translate_many(texts, src, tgt, limit=workers))
@@ -0,0 +1,231 @@
+# backends.py
+import html
+import os
+import re
+import threading
+from urllib.parse import urljoin
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    REQUESTS_AVAILABLE = True
+except Exception as e:
+    REQUESTS_AVAILABLE = False
+
+# Overridable so the app can be pointed at a local stand-in (see standin.py)
+GOOGLE_URL = os.environ.get("TRANSLATOR_GOOGLE_URL", "https://translate.google.com/m")
+LIBRE_URL = os.environ.get("TRANSLATOR_LIBRE_URL", "https://libretranslate.de/")
+# With or without a trailing slash on the instance URL
+LIBRE_TRANSLATE_URL = urljoin(LIBRE_URL.rstrip("/") + "/", "translate")
+
+HTTP_TIMEOUT = float(os.environ.get("TRANSLATOR_HTTP_TIMEOUT", "10"))
+HTTP_POOL_SIZE = int(os.environ.get("TRANSLATOR_HTTP_POOL_SIZE", "32"))
+
+
+class BackendError(Exception):
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class RateLimited(BackendError):
+    pass
+
+
+def _raise_for_status(response, backend):
+    if response.status_code == 429:
+        retry_after = response.headers.get("Retry-After")
+        raise RateLimited(
+            f"{backend}: too many requests",
+            status=429,
+            retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
+        )
+    if response.status_code >= 400:
+        raise BackendError(f"{backend}: HTTP {response.status_code}", status=response.status_code)
+
+
+# ---------------- Registry -----------------
+CLIENTS = {}
+
+
+def register(cls):
+    """Class decorator adding a backend client to CLIENTS under its ``name``."""
+    CLIENTS[cls.name] = cls
+    return cls
+
+
+def _env_list(name, default):
+    value = os.environ.get(name)
+    return {code.strip() for code in value.split(",") if code.strip()} if value else default
+
+
+# ---------------- Clients -----------------
+class HTTPClient:
+    """Base for backend clients; subclasses describe what the backend can serve.
+
+    Capabilities, as class attributes:
+      languages   codes the backend accepts (None: anything), "auto" included if it detects
+      codes       app code -> backend code where they differ
+      max_chars   longest text (or total of a batch) one request may carry
+      batch       whether the API itself takes a list of texts; if not,
+                  translate_many() packs them one per line
+      max_batch   most texts to send in one translate_many() call
+      rate_limit  default requests per second per language pair
+      concurrency default cap on in-flight requests
+      http        False for in-process backends, which have no request()/parse()
+
+    Each call is split into request() and parse() so the async engine can
+    send the very same request over its own HTTP client.
+    """
+
+    name = None
+    languages = None
+    codes = {}
+    max_chars = 5000
+    batch = False
+    max_batch = 100
+    rate_limit = 10.0
+    concurrency = 16
+    http = True
+
+    def __init__(self, source, target, session):
+        self.source = self.codes.get(source, source)
+        self.target = self.codes.get(target, target)
+        self.session = session
+
+    @classmethod
+    def supports(cls, src, tgt):
+        if tgt == "auto":
+            return False
+        return cls.languages is None or (src in cls.languages and tgt in cls.languages)
+
+    def translate(self, text):
+        if self.source == self.target or not text.strip():
+            return text.strip()
+        response = self.session.request(**self.request(text), timeout=HTTP_TIMEOUT)
+        return self.parse(response)
+
+    def translate_many(self, texts):
+        """Translate single-line texts in one request; None if the reply does not split back apart."""
+        parts = self.translate("\n".join(texts)).split("\n")
+        return parts if len(parts) == len(texts) else None
+
+
+@register
+class GoogleClient(HTTPClient):
+    """Same request as deep-translator's GoogleTranslator, over a shared session."""
+
+    name = "google"
+    max_chars = int(os.environ.get("TRANSLATOR_GOOGLE_MAX_CHARS", "5000"))
+    rate_limit = float(os.environ.get("TRANSLATOR_GOOGLE_RATE", "10"))
+    concurrency = int(os.environ.get("TRANSLATOR_GOOGLE_CONCURRENCY", "16"))
+    _result = re.compile(r'<div class="(?:result-container|t0)">(.*?)</div>', re.S)
+
+    def request(self, text):
+        text = text.strip()
+        if len(text) > self.max_chars:
+            raise BackendError(f"{self.name}: text longer than {self.max_chars} characters")
+        return {
+            "method": "GET",
+            "url": GOOGLE_URL,
+            "params": {"sl": self.source, "tl": self.target, "q": text},
+        }
+
+    def parse(self, response):
+        _raise_for_status(response, self.name)
+        match = self._result.search(response.text)
+        if not match:
+            raise BackendError(f"{self.name}: no translation in response")
+        return html.unescape(match.group(1)).strip()
+
+
+@register
+class LibreClient(HTTPClient):
+    """Same request as deep-translator's LibreTranslator, over a shared session."""
+
+    name = "libre"
+    # What libretranslate.com serves; set TRANSLATOR_LIBRE_LANGUAGES to match your instance
+    languages = _env_list(
+        "TRANSLATOR_LIBRE_LANGUAGES",
+        {"auto", "en", "ar", "ur", "hi", "es", "fr", "de", "zh-CN", "it", "pt", "ru", "ja", "ko", "tr", "fa"},
+    )
+    codes = {"zh-CN": "zh"}
+    max_chars = int(os.environ.get("TRANSLATOR_LIBRE_MAX_CHARS", "5000"))
+    # /translate takes an array for q; keep within the instance's --batch-limit
+    batch = True
+    max_batch = int(os.environ.get("TRANSLATOR_LIBRE_BATCH_SIZE", "50"))
+    rate_limit = float(os.environ.get("TRANSLATOR_LIBRE_RATE", "5"))
+    concurrency = int(os.environ.get("TRANSLATOR_LIBRE_CONCURRENCY", "16"))
+
+    def __init__(self, source, target, session):
+        super().__init__(source, target, session)
+        self.api_key = os.environ.get("LIBRE_API_KEY")
+
+    def request(self, text):
+        # A JSON body, like request_many(): keeps the key out of access logs
+        # and long texts out of the URL
+        body = {"q": text, "source": self.source, "target": self.target, "format": "text"}
+        if self.api_key:
+            body["api_key"] = self.api_key
+        return {"method": "POST", "url": LIBRE_TRANSLATE_URL, "json": body}
+
+    def parse(self, response):
+        _raise_for_status(response, self.name)
+        try:
+            return response.json()["translatedText"]
+        except (ValueError, KeyError):
+            raise BackendError(f"{self.name}: no translation in response")
+
+    def request_many(self, texts):
+        body = {"q": list(texts), "source": self.source, "target": self.target, "format": "text"}
+        if self.api_key:
+            body["api_key"] = self.api_key
+        return {"method": "POST", "url": LIBRE_TRANSLATE_URL, "json": body}
+
+    def parse_many(self, response, count):
+        translated = self.parse(response)
+        if (
+            not isinstance(translated, list)
+            or len(translated) != count
+            or not all(isinstance(t, str) for t in translated)
+        ):
+            raise BackendError(f"{self.name}: batch reply does not match the request")
+        return translated
+
+    def translate_many(self, texts):
+        if self.source == self.target:
+            return list(texts)
+        response = self.session.request(**self.request_many(texts), timeout=HTTP_TIMEOUT)
+        return self.parse_many(response, len(texts))
+
+
+def capable(backends, src, tgt):
+    """The given backends that can serve src -> tgt, in the same order."""
+    return [b for b in backends if CLIENTS[b].supports(src, tgt)]
+
+
+# ---------------- Pool -----------------
+class ClientPool:
+    """One client per (backend, src, tgt), all sharing one keep-alive session."""
+
+    def __init__(self, pool_size=HTTP_POOL_SIZE, cassette=None):
+        self.session = requests.Session()
+        # A cassette (see cassette.py) records or replays the traffic underneath the clients
+        factory = cassette.adapter if cassette else HTTPAdapter
+        adapter = factory(pool_connections=len(CLIENTS), pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def get(self, backend, src, tgt):
+        key = (backend, src, tgt)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = CLIENTS[backend](src, tgt, self.session)
+                    self._clients[key] = client
+        return client
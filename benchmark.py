@@ -0,0 +1,235 @@
+# benchmark.py
+"""Throughput and latency benchmarks for the translation paths, against the stand-in.
+
+    python benchmark.py --out baseline.json
+    python benchmark.py --out current.json --compare baseline.json
+
+Each case runs one path from a cold start (empty caches, fresh adaptive
+concurrency, breakers, rate limiters and latency history, so results do
+not depend on matrix order): "text" is concurrent translate_text calls
+(one per worker, like interactive sessions), "csv" is translate_column
+and "txt" is translate_document. The matrix covers input
+sizes, duplicate ratios, language pairs, worker counts and engines.
+Every case runs --repeat times and its median run is kept. With --compare,
+cases whose throughput fell or whose p95 latency rose by more than
+--tolerance against the baseline are listed and the exit status is 1;
+cases whose baseline took less than --noise-floor seconds are too short to
+judge and are skipped.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import corpus
+import standin
+from concurrency import AIMDController
+from health import CircuitBreaker, LatencyTracker
+from ratelimit import RateLimiter
+
+PATHS = ("text", "csv", "txt")
+KEY = ("path", "size", "dup", "src", "tgt", "workers", "engine")
+
+
+def percentile(samples, q):
+    if not samples:
+        return None
+    samples = sorted(samples)
+    return round(samples[min(len(samples) - 1, int(len(samples) * q / 100))], 4)
+
+
+def cold_start(translator, async_engine=None):
+    """Empty caches and fresh controllers, so no case inherits another's throttling or breaker state."""
+    translator.hot_cache.clear()
+    translator.memory.clear()
+    translator.concurrency = AIMDController()
+    # Updated in place: async_engine holds references to the same dicts
+    translator.breakers.update({b: CircuitBreaker() for b in translator.breakers})
+    translator.latencies.update({b: LatencyTracker() for b in translator.latencies})
+    translator.limiter = RateLimiter(translator.RATE_LIMITS)
+    if async_engine is not None:
+        async_engine.limiter = translator.limiter
+
+
+def run_case(translator, batch, path, texts, src, tgt, workers):
+    """Run one case; returns (seconds, per-call latencies, failures)."""
+    latencies = []
+    start = time.perf_counter()
+    if path == "text":
+
+        def one(text):
+            t = time.perf_counter()
+            result = translator.translate_text(text, src, tgt)
+            latencies.append(time.perf_counter() - t)
+            return result
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            output = list(pool.map(one, texts))
+        failures = output.count(translator.FAILED)
+    elif path == "csv":
+        import pandas as pd
+
+        output, _ = translator.translate_column(pd.Series(texts), src, tgt, workers=workers, batch=batch)
+        failures = int((output == translator.FAILED).sum())
+    else:
+        document = "\n\n".join(" ".join(texts[i:i + 5]) for i in range(0, len(texts), 5))
+        output = translator.translate_document(document, src, tgt, workers=workers, batch=batch)
+        failures = output.count(translator.FAILED)
+    return time.perf_counter() - start, latencies, failures
+
+
+def benchmark(args, server):
+    # Imported here: backends read their URLs and limits from the environment at import
+    import translator
+
+    engines = {"threads": translator.translate_batch}
+    async_engine = None
+    if "async" in args.engines:
+        import async_engine
+
+        engines["async"] = async_engine.translate_many
+    stats = list(server.profiles.values())
+    results = []
+    matrix = itertools.product(args.paths, args.sizes, args.dups, args.pairs, args.workers, args.engines)
+    for path, size, dup, (src, tgt), workers, engine in matrix:
+        if path == "text" and engine != args.engines[0]:
+            continue  # translate_text does not go through the batch engine
+        langs = corpus.LANGUAGES if src == "auto" else (src,)
+        texts = corpus.make_cells(size, langs, dup, mixed_rate=args.mixed_rate, seed=args.seed)
+        runs = []
+        for _ in range(args.repeat):
+            cold_start(translator, async_engine)
+            requests_before = sum(p.stats["requests"] for p in stats)
+            seconds, latencies, failures = run_case(translator, engines[engine], path, texts, src, tgt, workers)
+            requests = sum(p.stats["requests"] for p in stats) - requests_before
+            runs.append((seconds, latencies, failures, requests))
+        # The median run: one slow or lucky run does not move the result
+        seconds, latencies, failures, requests = sorted(runs, key=lambda run: run[0])[len(runs) // 2]
+        result = {
+            "path": path,
+            "size": size,
+            "dup": dup,
+            "src": src,
+            "tgt": tgt,
+            "workers": workers,
+            "engine": engine if path != "text" else None,
+            "seconds": round(seconds, 4),
+            "items_per_s": round(size / seconds, 2),
+            "chars_per_s": round(sum(map(len, texts)) / seconds, 1),
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "requests": requests,
+            "failures": failures,
+        }
+        print(
+            f"{path:4} n={size:<6} dup={dup:<4} {src}->{tgt} workers={workers:<3} {engine:7} "
+            f"{result['items_per_s']:>9.1f}/s  requests={result['requests']}  failures={failures}",
+            file=sys.stderr,
+        )
+        results.append(result)
+    return results
+
+
+def compare(results, baseline, tolerance, noise_floor=0.0):
+    """(regressions, skipped): cases slower than the baseline by more than ``tolerance`` (a fraction).
+
+    Cases whose baseline ran for less than ``noise_floor`` seconds are
+    skipped; at that length scheduling jitter outweighs any real change.
+    """
+    before = {tuple(r[k] for k in KEY): r for r in baseline["results"]}
+    regressions, skipped = [], 0
+    for result in results:
+        old = before.get(tuple(result[k] for k in KEY))
+        if old is None:
+            continue
+        if old["seconds"] < noise_floor:
+            skipped += 1
+            continue
+        if result["items_per_s"] < old["items_per_s"] * (1 - tolerance):
+            regressions.append((result, "items_per_s", old["items_per_s"], result["items_per_s"]))
+        if old["p95"] and result["p95"] and result["p95"] > old["p95"] * (1 + tolerance):
+            regressions.append((result, "p95", old["p95"], result["p95"]))
+    return regressions, skipped
+
+
+def _list(cast):
+    return lambda value: [cast(v) for v in value.split(",") if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paths", type=_list(str), default=list(PATHS))
+    parser.add_argument("--sizes", type=_list(int), default=[200, 2000])
+    parser.add_argument("--dups", type=_list(float), default=[0.0, 0.5, 0.9])
+    parser.add_argument("--pairs", type=_list(lambda p: tuple(p.split(":"))), default=[("en", "ur"), ("en", "de")])
+    parser.add_argument("--workers", type=_list(int), default=[4, 16])
+    parser.add_argument("--engines", type=_list(str), default=["threads"], help="threads,async")
+    parser.add_argument("--latency", default="lognormal:0.02,0.5", help="stand-in latency spec")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate", type=float, default=1000, help="client rate limit per backend (req/s)")
+    parser.add_argument("--mixed-rate", type=float, default=0.0, help="share of inputs mixing two scripts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write results as JSON here (default: stdout)")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the median is kept")
+    parser.add_argument("--noise-floor", type=float, default=0.25, help="seconds; shorter cases are not compared")
+    args = parser.parse_args(argv)
+
+    profile = dict(latency=args.latency, error_rate=args.error_rate, seed=args.seed)
+    server = standin.serve(google=standin.Profile(**profile), libre=standin.Profile(**profile))
+    base = f"http://127.0.0.1:{server.server_address[1]}/"
+    workdir = tempfile.mkdtemp(prefix="translator-bench-")
+    os.environ.update(
+        TRANSLATOR_GOOGLE_URL=base + "m",
+        TRANSLATOR_LIBRE_URL=base,
+        TRANSLATOR_TM_PATH=os.path.join(workdir, "tm.sqlite3"),
+        TRANSLATOR_GOOGLE_RATE=str(args.rate),
+        TRANSLATOR_LIBRE_RATE=str(args.rate),
+    )
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "latency": args.latency,
+            "error_rate": args.error_rate,
+            "rate": args.rate,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": benchmark(args, server),
+    }
+    server.shutdown()
+
+    data = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(data + "\n")
+    else:
+        print(data)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions, skipped = compare(report["results"], json.load(f), args.tolerance, args.noise_floor)
+        for result, metric, old, new in regressions:
+            case = " ".join(f"{k}={result[k]}" for k in KEY)
+            print(f"REGRESSION {case}: {metric} {old} -> {new}", file=sys.stderr)
+        print(
+            f"{len(regressions)} regression(s) against {args.compare}; "
+            f"{skipped} case(s) under {args.noise_floor}s not compared",
+            file=sys.stderr,
+        )
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+# cache.py
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize(text):
+    # Same text typed or exported slightly differently should hit the same entry
+    return unicodedata.normalize("NFC", text).strip()
+
+
+# ---------------- Hot cache (in process) -----------------
+class MemoryCache:
+    """Process-wide LRU of recent translations, bounded by resident bytes."""
+
+    # OrderedDict node + hash slot per entry, on top of the two bytes objects
+    ENTRY_OVERHEAD = 100
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(src, tgt, text):
+        # Stored as UTF-8 bytes: far smaller than a tuple of str for ASCII text
+        return f"{src}\x00{tgt}\x00{normalize(text)}".encode()
+
+    @classmethod
+    def _cost(cls, key, value):
+        return sys.getsizeof(key) + sys.getsizeof(value) + cls.ENTRY_OVERHEAD
+
+    def get(self, src, tgt, text):
+        key = self._key(src, tgt, text)
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+        return value.decode()
+
+    def put(self, src, tgt, text, translation):
+        key = self._key(src, tgt, text)
+        value = translation.encode()
+        cost = self._cost(key, value)
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.size -= self._cost(key, old)
+            self._data[key] = value
+            self.size += cost
+            while self.size > self.max_bytes:
+                k, v = self._data.popitem(last=False)
+                self.size -= self._cost(k, v)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.size = self.hits = self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# ---------------- Translation memory (on disk) -----------------
+class TranslationMemory:
+    """Persistent (src, tgt, backend, text) -> translation store with LRU eviction."""
+
+    EVICT_EVERY = 500
+
+    def __init__(self, path, max_entries=200_000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS tm (
+                src TEXT NOT NULL,
+                tgt TEXT NOT NULL,
+                backend TEXT NOT NULL,
+                text TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (src, tgt, backend, text)
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS tm_last_used ON tm (last_used)")
+
+    def get(self, src, tgt, text, backends=None):
+        """Return a stored translation, preferring backends in the given order."""
+        key = normalize(text)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT backend, translation FROM tm WHERE src=? AND tgt=? AND text=?",
+                (src, tgt, key),
+            ).fetchall()
+            if not rows:
+                self.misses += 1
+                return None
+            if backends:
+                rank = {b: i for i, b in enumerate(backends)}
+                rows.sort(key=lambda r: rank.get(r[0], len(rank)))
+            backend, translation = rows[0]
+            self._db.execute(
+                "UPDATE tm SET last_used=? WHERE src=? AND tgt=? AND backend=? AND text=?",
+                (time.time(), src, tgt, backend, key),
+            )
+            self.hits += 1
+            return translation
+
+    def put(self, src, tgt, backend, text, translation):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO tm VALUES (?, ?, ?, ?, ?, ?)",
+                (src, tgt, backend, normalize(text), translation, time.time()),
+            )
+            self._puts += 1
+            if self._puts % self.EVICT_EVERY == 0:
+                self._evict()
+
+    def _evict(self):
+        (count,) = self._db.execute("SELECT COUNT(*) FROM tm").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM tm WHERE rowid IN (SELECT rowid FROM tm ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM tm")
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            (entries,) = self._db.execute("SELECT COUNT(*) FROM tm").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,207 @@
+# cassette.py
+"""Record/replay of backend HTTP traffic, underneath the clients.
+
+Record a real job once, then replay it offline through the very same code
+paths (translate_text, the CSV and .txt jobs, the async engine):
+
+    TRANSLATOR_CASSETTE=job.cassette TRANSLATOR_CASSETTE_MODE=record streamlit run app.py
+    TRANSLATOR_CASSETTE=job.cassette TRANSLATOR_CASSETTE_LATENCY_SCALE=0.5 streamlit run app.py
+
+Each interaction is kept as one JSON line with its status, headers, body
+and how long the backend took. Replay sleeps for that time multiplied by
+the latency scale (0: answer at once). Replays only make the requests a
+run actually sends, so start from an empty translation memory
+(TRANSLATOR_TM_PATH) to compare runs.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import parse_qsl, urlsplit
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from requests.structures import CaseInsensitiveDict
+    from requests.utils import get_encoding_from_headers
+    REQUESTS_AVAILABLE = True
+except Exception as e:
+    REQUESTS_AVAILABLE = False
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except Exception as e:
+    HTTPX_AVAILABLE = False
+
+from backends import BackendError
+
+CASSETTE_PATH = os.environ.get("TRANSLATOR_CASSETTE")
+CASSETTE_MODE = os.environ.get("TRANSLATOR_CASSETTE_MODE", "replay")
+CASSETTE_LATENCY_SCALE = float(os.environ.get("TRANSLATOR_CASSETTE_LATENCY_SCALE", "1.0"))
+
+# Never written to the cassette nor part of the match
+SECRETS = {"api_key"}
+# Describe the bytes on the wire, which the cassette does not keep
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+class CassetteMiss(BackendError):
+    pass
+
+
+class Cassette:
+    """Recorded interactions, matched on method, URL path, query and body.
+
+    Query parameters and JSON or form bodies are compared parsed, so a
+    recording made through requests replays under httpx and vice versa, and
+    against any host. The same request sent several times replays its
+    recordings in order, then keeps repeating the last one.
+    """
+
+    def __init__(self, path, mode="replay", latency_scale=1.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"cassette mode must be record or replay, not {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._recorded = defaultdict(list)
+        self._played = defaultdict(int)
+        self._lock = threading.Lock()
+        if mode == "record":
+            self._file = open(path, "w", encoding="utf-8")
+        else:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._recorded[entry["key"]].append(entry)
+
+    @staticmethod
+    def key(method, url, body):
+        parts = urlsplit(url)
+        query = sorted((k, v) for k, v in parse_qsl(parts.query) if k not in SECRETS)
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", "replace")
+        try:
+            data = json.loads(body) if body else None
+            if isinstance(data, dict):
+                data = {k: v for k, v in data.items() if k not in SECRETS}
+        except ValueError:
+            data = sorted((k, v) for k, v in parse_qsl(body) if k not in SECRETS)
+        raw = json.dumps([method.upper(), parts.path, query, data], sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def record(self, key, method, url, status, headers, content, elapsed):
+        entry = {
+            "key": key,
+            "method": method,
+            "url": urlsplit(url)._replace(query="").geturl(),
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in DROPPED_HEADERS},
+            "elapsed": round(elapsed, 6),
+        }
+        try:
+            entry["body"] = content.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["body_b64"] = base64.b64encode(content).decode()
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def play(self, key, url):
+        """The recording for this request, or CassetteMiss."""
+        with self._lock:
+            entries = self._recorded.get(key)
+            if not entries:
+                raise CassetteMiss(f"cassette: no recording for {urlsplit(url).path}")
+            index = min(self._played[key], len(entries) - 1)
+            self._played[key] += 1
+        return entries[index]
+
+    def delay(self, entry):
+        return entry["elapsed"] * self.latency_scale
+
+    @staticmethod
+    def content(entry):
+        if "body_b64" in entry:
+            return base64.b64decode(entry["body_b64"])
+        return entry["body"].encode("utf-8")
+
+    def adapter(self, **kwargs):
+        """A requests transport adapter playing or recording this cassette."""
+        return CassetteAdapter(self, **kwargs)
+
+    def async_transport(self, transport):
+        """An httpx transport playing this cassette, or recording through ``transport``."""
+        return AsyncCassetteTransport(self, transport)
+
+
+if REQUESTS_AVAILABLE:
+
+    class CassetteAdapter(HTTPAdapter):
+        def __init__(self, cassette, **kwargs):
+            super().__init__(**kwargs)
+            self.cassette = cassette
+
+        def send(self, request, **kwargs):
+            key = self.cassette.key(request.method, request.url, request.body)
+            if self.cassette.mode == "replay":
+                entry = self.cassette.play(key, request.url)
+                time.sleep(self.cassette.delay(entry))
+                response = requests.Response()
+                response.status_code = entry["status"]
+                response.headers = CaseInsensitiveDict(entry["headers"])
+                response.encoding = get_encoding_from_headers(response.headers)
+                response._content = self.cassette.content(entry)
+                response.url = request.url
+                response.request = request
+                return response
+            start = time.monotonic()
+            response = super().send(request, **kwargs)
+            content = response.content
+            self.cassette.record(
+                key, request.method, request.url, response.status_code, response.headers, content,
+                time.monotonic() - start,
+            )
+            return response
+
+
+if HTTPX_AVAILABLE:
+
+    class AsyncCassetteTransport(httpx.AsyncBaseTransport):
+        def __init__(self, cassette, transport):
+            self.cassette = cassette
+            self.transport = transport
+
+        async def handle_async_request(self, request):
+            url = str(request.url)
+            key = self.cassette.key(request.method, url, request.content)
+            if self.cassette.mode == "replay":
+                entry = self.cassette.play(key, url)
+                await asyncio.sleep(self.cassette.delay(entry))
+                return httpx.Response(entry["status"], headers=entry["headers"], content=self.cassette.content(entry))
+            start = time.monotonic()
+            response = await self.transport.handle_async_request(request)
+            # Read through httpx so any content encoding is undone, as for requests
+            raw = httpx.Response(response.status_code, headers=response.headers, stream=response.stream)
+            content = await raw.aread()
+            self.cassette.record(
+                key, request.method, url, response.status_code, response.headers, content, time.monotonic() - start
+            )
+            headers = {k: v for k, v in response.headers.items() if k.lower() not in DROPPED_HEADERS}
+            return httpx.Response(response.status_code, headers=headers, content=content)
+
+        async def aclose(self):
+            await self.transport.aclose()
+
+
+def from_env():
+    """The cassette configured by TRANSLATOR_CASSETTE*, or None."""
+    if not CASSETTE_PATH:
+        return None
+    return Cassette(CASSETTE_PATH, CASSETTE_MODE, CASSETTE_LATENCY_SCALE)
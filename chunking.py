@@ -0,0 +1,65 @@
+# chunking.py
+import re
+
+# End of sentence (Latin, Urdu, Arabic, Devanagari and CJK punctuation);
+# CJK text runs on without a space after full-width punctuation
+SENTENCE_END = re.compile(r"[.!?;؟۔।]+[\"'”’)\]]*\s+|[。！？；]+[”’」』）)]*\s*")
+
+# Preferred cut points, best first: paragraph break, line break, end of
+# sentence, any space.
+BOUNDARIES = [
+    re.compile(r"\n[ \t]*\n\s*"),
+    re.compile(r"\n\s*"),
+    SENTENCE_END,
+    re.compile(r"\s+"),
+]
+
+_SENTENCE_OR_LINE = re.compile(rf"\n\s*|{SENTENCE_END.pattern}")
+
+_EDGES = re.compile(r"(\s*)(.*?)(\s*)$", re.S)
+
+
+def _cut(window):
+    for pattern in BOUNDARIES:
+        last = None
+        for last in pattern.finditer(window):
+            pass
+        if last is not None:
+            return last.end()
+    return len(window)
+
+
+def split_text(text, limit):
+    """Split text into pieces of at most ``limit`` characters.
+
+    Cuts fall on the best boundary available inside each window, and the
+    whitespace at a cut stays with the piece before it, so
+    ``"".join(split_text(text, limit)) == text``.
+    """
+    pieces = []
+    start = 0
+    while len(text) - start > limit:
+        cut = _cut(text[start:start + limit])
+        pieces.append(text[start:start + cut])
+        start += cut
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
+
+
+def split_sentences(text):
+    """Split text after every line break and sentence end; ``"".join(pieces) == text``."""
+    pieces = []
+    start = 0
+    for match in _SENTENCE_OR_LINE.finditer(text):
+        if match.end() > start:
+            pieces.append(text[start:match.end()])
+            start = match.end()
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
+
+
+def split_edges(piece):
+    """Return (leading whitespace, content, trailing whitespace)."""
+    return _EDGES.match(piece).groups()
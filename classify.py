@@ -0,0 +1,20 @@
+# classify.py
+import re
+
+# Cells that read the same in every language: nothing to translate
+PASSTHROUGH = re.compile(
+    r"""\s*(?:
+        [\W\d_]*                            # no letters: numbers, money, dates, phone numbers, punctuation
+      | [\w.+-]+@[\w-]+(?:\.[\w-]+)+        # email address
+      | (?:[a-zA-Z][a-zA-Z0-9+.-]*://|www\.)\S+   # URL
+      | \S*\d\S*                            # single token with a digit: IDs, SKUs, codes, 2024-01-05
+    )\s*""",
+    re.X,
+)
+
+
+def passthrough_mask(values):
+    """Boolean Series, True where a cell should be copied through untranslated."""
+    text = values.astype(str)
+    matched = text.str.fullmatch(PASSTHROUGH).fillna(True).astype(bool)
+    return values.isna() | matched
@@ -0,0 +1,83 @@
+# concurrency.py
+import os
+import threading
+import time
+from collections import deque
+
+AIMD_INITIAL = float(os.environ.get("TRANSLATOR_AIMD_INITIAL", "4"))
+AIMD_MAX = float(os.environ.get("TRANSLATOR_AIMD_MAX", "64"))
+AIMD_BACKOFF = float(os.environ.get("TRANSLATOR_AIMD_BACKOFF", "0.5"))
+AIMD_LATENCY_FACTOR = float(os.environ.get("TRANSLATOR_AIMD_LATENCY_FACTOR", "2.5"))
+# Successful latencies the baseline is the median of
+AIMD_WINDOW = int(os.environ.get("TRANSLATOR_AIMD_WINDOW", "20"))
+
+
+class AIMDController:
+    """Additive-increase / multiplicative-decrease limit on in-flight requests.
+
+    Every healthy completion adds ``1 / limit`` (one extra slot per round of
+    requests). A failure, a throttle or a latency well above the baseline
+    multiplies the limit by ``backoff``, at most once per baseline latency
+    so one burst of errors counts as one congestion event. The baseline is
+    the median of the last ``window`` successful latencies, spikes included,
+    so a backend that gets slower for good raises it instead of pinning the
+    limit at the minimum. The last changes and their reasons are kept in
+    ``events``.
+    """
+
+    def __init__(
+        self,
+        initial=AIMD_INITIAL,
+        minimum=1,
+        maximum=AIMD_MAX,
+        backoff=AIMD_BACKOFF,
+        latency_factor=AIMD_LATENCY_FACTOR,
+        window=AIMD_WINDOW,
+    ):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.latency_factor = latency_factor
+        self.in_flight = 0
+        self.baseline = None
+        self._samples = deque(maxlen=window)
+        self.events = deque(maxlen=20)
+        self._last_decrease = 0.0
+        self._reported = int(self.limit)
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, latency, ok=True, reason=None):
+        """Report a finished request; ``reason`` names the failure when ok is False."""
+        now = time.monotonic()
+        with self._cond:
+            self.in_flight -= 1
+            spike = self.baseline is not None and latency > self.baseline * self.latency_factor
+            if ok:
+                self._samples.append(latency)
+                self.baseline = sorted(self._samples)[len(self._samples) // 2]
+            if not ok or spike:
+                if now - self._last_decrease >= (self.baseline or 1.0):
+                    self._last_decrease = now
+                    self.limit = max(self.minimum, self.limit * self.backoff)
+                    self._note(reason or ("latency spike" if ok else "errors"))
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                if int(self.limit) > self._reported:
+                    self._note("healthy")
+            self._cond.notify_all()
+
+    def history(self):
+        """The recorded limit changes, oldest first; safe while other threads add to them."""
+        with self._cond:
+            return list(self.events)
+
+    def _note(self, reason):
+        self._reported = int(self.limit)
+        self.events.append((time.time(), self._reported, reason))
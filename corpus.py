@@ -0,0 +1,169 @@
+# corpus.py
+"""Seeded synthetic multilingual inputs for benchmarks and load tests.
+
+    python corpus.py csv rows.csv --rows 50000 --dup 0.6 --null-rate 0.05
+    python corpus.py txt doc.txt --paragraphs 500 --langs en,ur,zh-CN
+
+Languages are the codes the app offers (LANGS in app.py). The same
+arguments and --seed always produce the same file.
+"""
+import argparse
+import csv
+import math
+import random
+
+VOCAB = {
+    "en": "order customer delivery payment invoice refund product account warehouse report meeting "
+    "schedule price discount shipment address contract support request update team office week",
+    "es": "pedido cliente entrega pago factura reembolso producto cuenta almacén informe reunión "
+    "horario precio descuento envío dirección contrato soporte solicitud equipo oficina semana",
+    "fr": "commande client livraison paiement facture remboursement produit compte entrepôt rapport "
+    "réunion horaire prix remise expédition adresse contrat assistance demande équipe bureau semaine",
+    "de": "Bestellung Kunde Lieferung Zahlung Rechnung Erstattung Produkt Konto Lager Bericht Besprechung "
+    "Zeitplan Preis Rabatt Sendung Adresse Vertrag Unterstützung Anfrage Team Büro Woche",
+    "ur": "آرڈر گاہک ترسیل ادائیگی بل واپسی مصنوعات اکاؤنٹ گودام رپورٹ میٹنگ شیڈول قیمت رعایت "
+    "کھیپ پتہ معاہدہ مدد درخواست ٹیم دفتر ہفتہ",
+    "ar": "طلب عميل توصيل دفع فاتورة استرداد منتج حساب مستودع تقرير اجتماع جدول سعر خصم شحنة "
+    "عنوان عقد دعم طلبية فريق مكتب أسبوع",
+    "hi": "ऑर्डर ग्राहक डिलीवरी भुगतान बिल वापसी उत्पाद खाता गोदाम रिपोर्ट बैठक समय कीमत छूट "
+    "शिपमेंट पता अनुबंध सहायता अनुरोध टीम कार्यालय सप्ताह",
+    "zh-CN": "订单 客户 配送 付款 发票 退款 产品 账户 仓库 报告 会议 日程 价格 折扣 货运 地址 合同 "
+    "支持 请求 团队 办公室 星期",
+}
+VOCAB = {lang: words.split() for lang, words in VOCAB.items()}
+LANGUAGES = tuple(VOCAB)
+
+# Scripts written without spaces between words
+UNSPACED = {"zh-CN"}
+STOPS = {"ur": "۔", "ar": ".", "hi": "।", "zh-CN": "。"}
+
+
+def length_sampler(spec):
+    """Parse a words-per-cell spec: "8", "uniform:lo,hi" or "lognormal:median,sigma"."""
+    kind, _, args = str(spec).partition(":")
+    if not args:
+        value = int(kind)
+        return lambda rng: value
+    a, b = (float(x) for x in args.split(","))
+    if kind == "uniform":
+        return lambda rng: rng.randint(int(a), int(b))
+    if kind == "lognormal":
+        return lambda rng: max(1, round(rng.lognormvariate(math.log(a), b)))
+    raise ValueError(f"unknown length distribution: {kind}")
+
+
+def sentence(rng, lang, words):
+    picked = [rng.choice(VOCAB[lang]) for _ in range(words)]
+    text = ("" if lang in UNSPACED else " ").join(picked)
+    return text[:1].upper() + text[1:] + STOPS.get(lang, ".")
+
+
+def noise(rng):
+    """A cell with nothing to translate: number, money, date, ID, URL or email."""
+    kind = rng.randrange(6)
+    if kind == 0:
+        return str(rng.randint(0, 10**6))
+    if kind == 1:
+        return f"${rng.randint(1, 9999)}.{rng.randint(0, 99):02d}"
+    if kind == 2:
+        return f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+    if kind == 3:
+        return f"SKU-{rng.randint(10000, 99999)}"
+    if kind == 4:
+        return f"https://example.com/item/{rng.randint(1, 10**5)}"
+    return f"user{rng.randint(1, 10**4)}@example.com"
+
+
+def cell(rng, langs, length, noise_rate, mixed_rate):
+    roll = rng.random()
+    if roll < noise_rate:
+        return noise(rng)
+    lang = rng.choice(langs)
+    text = sentence(rng, lang, length(rng))
+    if roll < noise_rate + mixed_rate:
+        # A foreign term or two inside the sentence, as in real free-text fields
+        other = rng.choice([l for l in LANGUAGES if l != lang])
+        text += " " + " ".join(rng.choice(VOCAB[other]) for _ in range(rng.randint(1, 3)))
+    return text
+
+
+def make_cells(
+    count,
+    langs=LANGUAGES,
+    dup=0.0,
+    null_rate=0.0,
+    noise_rate=0.0,
+    mixed_rate=0.0,
+    length="lognormal:8,0.6",
+    seed=0,
+):
+    """``count`` cells; about a ``dup`` share repeat earlier values (Zipf-like), ``null_rate`` are None."""
+    if count <= 0:
+        return []
+    rng = random.Random(seed)
+    length = length_sampler(length)
+    target = min(count, max(1, round(count * (1 - dup))))
+    unique = {}
+    for _ in range(target * 20):
+        if len(unique) == target:
+            break
+        unique.setdefault(cell(rng, langs, length, noise_rate, mixed_rate), None)
+    unique = list(unique)
+    weights = [1 / (k + 1) for k in range(len(unique))]
+    cells = unique + rng.choices(unique, weights=weights, k=count - len(unique))
+    rng.shuffle(cells)
+    return [None if rng.random() < null_rate else c for c in cells]
+
+
+def make_document(paragraphs, langs=LANGUAGES, length="lognormal:8,0.6", seed=0):
+    """Plain text of ``paragraphs`` paragraphs, each in one language, with the odd heading."""
+    rng = random.Random(seed)
+    length = length_sampler(length)
+    blocks = []
+    for _ in range(paragraphs):
+        lang = rng.choice(langs)
+        if rng.random() < 0.1:
+            blocks.append(sentence(rng, lang, rng.randint(2, 4)).rstrip(STOPS.get(lang, ".")))
+        sentences = [sentence(rng, lang, length(rng)) for _ in range(rng.randint(1, 6))]
+        blocks.append(("" if lang in UNSPACED else " ").join(sentences))
+    return "\n\n".join(blocks) + "\n"
+
+
+def write_csv(path, cells, column="text"):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", column])
+        for i, value in enumerate(cells):
+            writer.writerow([i, "" if value is None else value])
+
+
+def _langs(value):
+    langs = tuple(code for code in value.split(",") if code)
+    unknown = set(langs) - set(LANGUAGES)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown language(s): {', '.join(sorted(unknown))}")
+    return langs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("kind", choices=("csv", "txt"))
+    parser.add_argument("path")
+    parser.add_argument("--rows", type=int, default=10000, help="csv: number of rows")
+    parser.add_argument("--paragraphs", type=int, default=200, help="txt: number of paragraphs")
+    parser.add_argument("--langs", type=_langs, default=LANGUAGES)
+    parser.add_argument("--dup", type=float, default=0.5, help="csv: share of rows repeating another")
+    parser.add_argument("--null-rate", type=float, default=0.02, help="csv: share of empty cells")
+    parser.add_argument("--noise-rate", type=float, default=0.1, help="csv: numbers, IDs, URLs, emails")
+    parser.add_argument("--mixed-rate", type=float, default=0.05, help="csv: cells mixing two scripts")
+    parser.add_argument("--length", default="lognormal:8,0.6", help="words per sentence")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.kind == "csv":
+        cells = make_cells(
+            args.rows, args.langs, args.dup, args.null_rate, args.noise_rate, args.mixed_rate, args.length, args.seed
+        )
+        write_csv(args.path, cells)
+    else:
+        with open(args.path, "w", encoding="utf-8") as f:
+            f.write(make_document(args.paragraphs, args.langs, args.length, args.seed))
@@ -0,0 +1,233 @@
+# detect.py
+"""Offline source-language detection for the "Auto-detect" option.
+
+Non-Latin scripts are decided by their letters and a few function words.
+Latin text is scored against small character-trigram profiles for the
+Latin-script languages the app offers and for common ones it does not, and
+must also fit the winning profile in absolute terms, so text in a language
+outside the app's list is not pinned on the nearest one it offers.
+Anything short, ambiguous or unknown is left as "auto" for the backend.
+"""
+import math
+import os
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+
+DETECT_THRESHOLD = float(os.environ.get("TRANSLATOR_DETECT_THRESHOLD", "0.9"))
+MIN_LATIN_LETTERS = 12
+# Share of a text's trigrams its best profile must contain; below it the
+# text is in none of the profiled languages
+MIN_LATIN_COVERAGE = float(os.environ.get("TRANSLATOR_DETECT_MIN_COVERAGE", "0.3"))
+
+# Letters only Urdu uses (Persian has none of them), letters only Arabic
+# uses, and the letters Urdu shares with Persian but not with Arabic
+URDU_LETTERS = set("ٹڈڑںےۓہھۂ")
+ARABIC_LETTERS = set("ةيكىؤإأ")
+PERSIAN_URDU_LETTERS = set("گچپژکی")
+# Arabic and Persian write h as ه where Urdu uses ہ or ھ
+HEH = "ه"
+
+# Devanagari function words: Hindi ones, and Marathi and Nepali ones that
+# Hindi does not use
+HINDI_WORDS = set(
+    "है हैं था थे थी का की के में और से नहीं यह वह कि लिए ने पर भी गया गई गए किया कर रहा रही "
+    "आप आपका आपकी आपके अपना अपनी अपने हम हमें हमारा तक जाएगा जाएगी होगा करें लें".split()
+)
+OTHER_DEVANAGARI_WORDS = set(
+    "आहे आहेत आणि नाही च्या ची चा चे ला मध्ये होते केले " "छ छन् र मा लाई हुन्छ थियो पनि भएको गर्न यो त्यो".split()
+)
+
+SAMPLES = {
+    "en": (
+        "the quick brown fox jumps over the lazy dog. this is a short sample of ordinary english "
+        "text with the most common words: the, and, of, to, in, is, that, for, it, with, as, was, "
+        "on, be, by, this, have, from, or, which, you, they, we, there, their, would, what, about. "
+        "please check your order status and contact customer service if anything is missing. "
+        "thank you for shopping with us, your delivery should arrive within three working days."
+    ),
+    "es": (
+        "el rápido zorro marrón salta sobre el perro perezoso. este es un breve ejemplo de texto "
+        "en español con las palabras más comunes: de, la, que, el, en, y, los, del, se, las, por, "
+        "un, para, con, no, una, su, al, lo, como, más, pero, sus, le, ya, o, este, sí, porque. "
+        "por favor revise el estado de su pedido y contacte con atención al cliente si falta algo. "
+        "gracias por comprar con nosotros, su entrega llegará en tres días hábiles."
+    ),
+    "fr": (
+        "le renard brun rapide saute par-dessus le chien paresseux. voici un court exemple de texte "
+        "en français avec les mots les plus courants : de, la, le, et, les, des, en, un, du, une, "
+        "que, est, pour, qui, dans, par, plus, pas, au, sur, ne, se, ce, il, sont, avec, leur, nous. "
+        "veuillez vérifier l'état de votre commande et contacter le service client s'il manque quelque "
+        "chose. merci pour votre achat, votre livraison arrivera sous trois jours ouvrables."
+    ),
+    "de": (
+        "der schnelle braune fuchs springt über den faulen hund. dies ist ein kurzes beispiel für "
+        "deutschen text mit den häufigsten wörtern: der, die, und, in, den, von, zu, das, mit, sich, "
+        "des, auf, für, ist, im, dem, nicht, ein, eine, als, auch, es, an, werden, aus, er, hat, dass. "
+        "bitte überprüfen sie den status ihrer bestellung und wenden sie sich an den kundendienst, "
+        "wenn etwas fehlt. vielen dank für ihren einkauf, die lieferung kommt in drei werktagen."
+    ),
+}
+
+# Latin-script languages the app does not offer; a text closest to one of
+# these is left as "auto"
+OTHER_SAMPLES = {
+    "it": (
+        "la volpe marrone veloce salta sopra il cane pigro. questo è un breve esempio di testo "
+        "italiano con le parole più comuni: di, che, il, la, per, un, non, in, una, sono, mi, ho, "
+        "lo, ma, ti, ha, le, si, con, cosa, questo, bene, gli, della, anche, come, nel, perché. "
+        "si prega di controllare lo stato del suo ordine e di contattare il servizio clienti se "
+        "manca qualcosa. grazie per il suo acquisto, la consegna arriverà entro tre giorni lavorativi. "
+        "il pagamento della fattura è previsto alla fine del mese e la riunione è stata spostata."
+    ),
+    "pt": (
+        "a rápida raposa marrom salta sobre o cão preguiçoso. este é um pequeno exemplo de texto "
+        "em português com as palavras mais comuns: de, que, não, o, a, do, da, em, um, para, é, com, "
+        "uma, os, no, se, na, por, mais, as, dos, como, mas, foi, ao, ele, das, tem, seu, sua, ou. "
+        "por favor verifique o estado da sua encomenda e contacte o serviço de apoio se faltar alguma "
+        "coisa. obrigado pela sua compra, a entrega chegará dentro de três dias úteis. "
+        "o pagamento da fatura está previsto para o fim do mês e a reunião foi adiada."
+    ),
+    "nl": (
+        "de snelle bruine vos springt over de luie hond. dit is een kort voorbeeld van nederlandse "
+        "tekst met de meest gebruikte woorden: de, van, een, het, en, in, is, dat, op, te, zijn, "
+        "voor, met, die, niet, aan, er, om, ook, als, bij, maar, door, of, nog, uit, wordt, naar, we. "
+        "controleer de status van uw bestelling en neem contact op met de klantenservice als er iets "
+        "ontbreekt. bedankt voor uw aankoop, de levering komt binnen drie werkdagen aan."
+    ),
+    "sv": (
+        "den snabba bruna räven hoppar över den lata hunden. detta är ett kort exempel på svensk "
+        "text med de vanligaste orden: och, i, att, det, som, en, på, är, av, för, med, till, den, "
+        "har, de, inte, om, ett, han, men, var, jag, sig, från, vi, så, kan, man, när, år, säger. "
+        "kontrollera status för din beställning och kontakta kundtjänst om något saknas. tack för "
+        "ditt köp, leveransen kommer inom tre arbetsdagar."
+    ),
+    "pl": (
+        "szybki brązowy lis przeskakuje nad leniwym psem. to jest krótki przykład polskiego tekstu "
+        "z najczęstszymi słowami: i, w, nie, na, się, z, jest, do, że, to, jak, ale, co, o, od, po, "
+        "tak, za, jego, przez, czy, już, dla, tylko, może, być, był, które, jej, mnie, bardzo, ich. "
+        "prosimy sprawdzić status zamówienia i skontaktować się z obsługą klienta, jeśli czegoś "
+        "brakuje. dziękujemy za zakupy, dostawa dotrze w ciągu trzech dni roboczych."
+    ),
+    "tr": (
+        "hızlı kahverengi tilki tembel köpeğin üzerinden atlar. bu en yaygın kelimelerle yazılmış "
+        "kısa bir türkçe metin örneğidir: bir, ve, bu, da, de, için, çok, ne, ben, sen, o, ile, gibi, "
+        "daha, var, yok, ama, kadar, sonra, olarak, olan, her, şey, değil, mi, onun, bizim, sizin. "
+        "lütfen siparişinizin durumunu kontrol edin ve eksik bir şey varsa müşteri hizmetleriyle "
+        "iletişime geçin. alışverişiniz için teşekkür ederiz, teslimat üç iş günü içinde gelecektir."
+    ),
+    "id": (
+        "rubah cokelat yang cepat melompati anjing yang malas. ini adalah contoh singkat teks bahasa "
+        "indonesia dengan kata yang paling umum: yang, dan, di, itu, dengan, untuk, tidak, ini, dari, "
+        "dalam, akan, pada, juga, saya, ke, karena, tersebut, bisa, ada, mereka, lebih, kami, anda. "
+        "silakan periksa status pesanan anda dan hubungi layanan pelanggan jika ada yang kurang. "
+        "terima kasih telah berbelanja, pengiriman akan tiba dalam tiga hari kerja."
+    ),
+}
+
+
+def _words(text):
+    return "".join(c if c.isalpha() else " " for c in text.lower()).split()
+
+
+def _trigrams(text):
+    for word in _words(text):
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            yield padded[i:i + 3]
+
+
+def _profile(sample):
+    counts = Counter(_trigrams(sample))
+    total = sum(counts.values())
+    # Add-one smoothing over the observed vocabulary; unseen trigrams get the floor
+    vocab = len(counts) + 1
+    return {g: math.log((n + 1) / (total + vocab)) for g, n in counts.items()}, math.log(1 / (total + vocab))
+
+
+PROFILES = {lang: _profile(sample) for lang, sample in {**SAMPLES, **OTHER_SAMPLES}.items()}
+VOCABULARY = {lang: set(_words(sample)) for lang, sample in {**SAMPLES, **OTHER_SAMPLES}.items()}
+
+
+def _script(ch):
+    name = unicodedata.name(ch, "")
+    if name.startswith("ARABIC"):
+        return "arabic"
+    if name.startswith("DEVANAGARI"):
+        return "devanagari"
+    if name.startswith("CJK UNIFIED IDEOGRAPH"):
+        return "han"
+    if name.startswith(("HIRAGANA", "KATAKANA", "HANGUL")):
+        return "other"
+    if name.startswith("LATIN"):
+        return "latin"
+    return "other"
+
+
+def _detect_latin(text):
+    grams = list(_trigrams(text))
+    if not grams:
+        return "auto", 0.0
+    scores = {}
+    for lang, (logp, floor) in PROFILES.items():
+        scores[lang] = sum(logp.get(g, floor) for g in grams)
+    best = max(scores, key=scores.get)
+    if best not in SAMPLES:
+        return "auto", 0.0
+    # Relative scores alone would name the least bad language; the text has
+    # to look like the winner too
+    coverage = sum(g in PROFILES[best][0] for g in grams) / len(grams)
+    if coverage < MIN_LATIN_COVERAGE:
+        return "auto", 0.0
+    # Close relatives (Portuguese and Spanish) share most trigrams but few
+    # function words: another language knowing more of the words is a tie
+    words = _words(text)
+    known = {lang: sum(w in vocabulary for w in words) for lang, vocabulary in VOCABULARY.items()}
+    if max(known.values()) > known[best]:
+        return "auto", 0.0
+    # Posterior under equal priors
+    total = sum(math.exp(s - scores[best]) for s in scores.values())
+    return best, 1 / total
+
+
+@lru_cache(maxsize=65536)
+def detect(text):
+    """Return (language code, confidence); ("auto", 0.0) when unsure."""
+    scripts = Counter(_script(c) for c in text if c.isalpha())
+    letters = sum(scripts.values())
+    if not letters:
+        return "auto", 0.0
+    script, count = scripts.most_common(1)[0]
+    share = count / letters
+
+    if script == "arabic":
+        urdu = sum(c in URDU_LETTERS for c in text)
+        arabic = sum(c in ARABIC_LETTERS for c in text)
+        # Persian (and any other Arabic-script language) has neither kind of
+        # letter to speak of, and counts against both
+        if urdu > arabic:
+            return "ur", share * urdu / (urdu + arabic + text.count(HEH))
+        if arabic > urdu:
+            return "ar", share * arabic / (urdu + arabic + sum(c in PERSIAN_URDU_LETTERS for c in text))
+        return "auto", 0.0
+    if script == "devanagari":
+        words = "".join(c if c.isalpha() or unicodedata.category(c)[0] == "M" else " " for c in text).split()
+        hindi = sum(w in HINDI_WORDS for w in words)
+        other = sum(w in OTHER_DEVANAGARI_WORDS for w in words) + text.count("ळ")
+        if not hindi:
+            return "auto", 0.0
+        return "hi", share * hindi / (hindi + other)
+    if script == "han" and not scripts["other"]:
+        return "zh-CN", share
+    if script == "latin" and count >= MIN_LATIN_LETTERS:
+        lang, confidence = _detect_latin(text)
+        return lang, share * confidence
+    return "auto", 0.0
+
+
+def resolve_source(text, src, threshold=DETECT_THRESHOLD):
+    """Replace "auto" with a locally detected code when confident enough."""
+    if src != "auto":
+        return src
+    lang, confidence = detect(text)
+    return lang if confidence >= threshold else src
@@ -0,0 +1,159 @@
+# health.py
+import os
+import random
+import threading
+import time
+from collections import deque
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+BREAKER_WINDOW = float(os.environ.get("TRANSLATOR_BREAKER_WINDOW", "30"))
+BREAKER_ERROR_RATE = float(os.environ.get("TRANSLATOR_BREAKER_ERROR_RATE", "0.5"))
+BREAKER_MIN_CALLS = int(os.environ.get("TRANSLATOR_BREAKER_MIN_CALLS", "5"))
+BREAKER_COOLDOWN = float(os.environ.get("TRANSLATOR_BREAKER_COOLDOWN", "15"))
+BREAKER_MAX_COOLDOWN = float(os.environ.get("TRANSLATOR_BREAKER_MAX_COOLDOWN", "300"))
+LATENCY_SAMPLES = int(os.environ.get("TRANSLATOR_LATENCY_SAMPLES", "500"))
+# Assumed latency for a backend nothing has been measured on yet
+ROUTE_DEFAULT_LATENCY = float(os.environ.get("TRANSLATOR_ROUTE_DEFAULT_LATENCY", "1.0"))
+
+
+class CircuitBreaker:
+    """Rolling error-rate breaker for one backend.
+
+    Closed: calls flow and outcomes are recorded over the last ``window``
+    seconds. Once at least ``min_calls`` outcomes are in the window and the
+    error rate reaches ``error_rate``, the breaker opens and calls are
+    refused for ``cooldown`` seconds. After that a single probe is let
+    through (half-open): success closes the breaker, failure reopens it
+    with the cooldown doubled, up to ``max_cooldown``.
+    """
+
+    def __init__(
+        self,
+        window=BREAKER_WINDOW,
+        error_rate=BREAKER_ERROR_RATE,
+        min_calls=BREAKER_MIN_CALLS,
+        cooldown=BREAKER_COOLDOWN,
+        max_cooldown=BREAKER_MAX_COOLDOWN,
+    ):
+        self.window = window
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._probing = False
+        self._outcomes = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now):
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            self._outcomes.popleft()
+
+    def allow(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record(self, ok):
+        now = time.monotonic()
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+                if ok:
+                    self.state = CLOSED
+                    self.cooldown = self.base_cooldown
+                    self._outcomes.clear()
+                else:
+                    self.state = OPEN
+                    self.opened_at = now
+                    self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                return
+            self._outcomes.append((now, ok))
+            self._trim(now)
+            calls = len(self._outcomes)
+            if self.state == CLOSED and calls >= self.min_calls:
+                errors = sum(1 for _, good in self._outcomes if not good)
+                if errors / calls >= self.error_rate:
+                    self.state = OPEN
+                    self.opened_at = now
+
+    def retry_in(self):
+        """Seconds until the breaker will let a call through again (0 if it would now)."""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def error_rate_now(self):
+        with self._lock:
+            self._trim(time.monotonic())
+            if not self._outcomes:
+                return 0.0
+            return sum(1 for _, good in self._outcomes if not good) / len(self._outcomes)
+
+    def score(self):
+        """Health in [0, 1]: 0 while open, otherwise the recent success rate."""
+        if self.state == OPEN:
+            return 0.0
+        return 1.0 - self.error_rate_now()
+
+
+class LatencyTracker:
+    """Latencies of the last ``size`` successful calls to one backend."""
+
+    MIN_SAMPLES = 20
+
+    def __init__(self, size=LATENCY_SAMPLES):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q):
+        """The q-th percentile in seconds, or None until enough calls have been seen."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < self.MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * q / 100))]
+
+
+def by_health(backends, breakers):
+    """Order backends healthiest first; ties keep the configured order."""
+    return sorted(backends, key=lambda b: (-breakers[b].score(), backends.index(b)))
+
+
+def throughput(backend, breakers, latencies, concurrency, rates):
+    """Requests per second a backend can take right now, scaled by its health.
+
+    Its concurrency cap divided by the mean of its rolling p50 and p95
+    latency, no more than its rate limit.
+    """
+    p50 = latencies[backend].percentile(50) or ROUTE_DEFAULT_LATENCY
+    p95 = latencies[backend].percentile(95) or p50
+    return breakers[backend].score() * min(concurrency[backend] / ((p50 + p95) / 2), rates[backend])
+
+
+def route(backends, breakers, latencies, concurrency, rates):
+    """Fallback order for one request, led by a backend drawn in proportion to its throughput.
+
+    Spreading a batch job this way makes the backends' capacities add up
+    instead of everything queueing on the healthiest one.
+    """
+    weights = [throughput(b, breakers, latencies, concurrency, rates) for b in backends]
+    order = by_health(backends, breakers)
+    if not any(weights):
+        return order
+    first = random.choices(backends, weights=weights)[0]
+    return [first] + [b for b in order if b != first]
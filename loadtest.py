@@ -0,0 +1,370 @@
+# loadtest.py
+"""Multi-session load test of one app.py process against the stand-in backend.
+
+    python loadtest.py --sessions 1,2,4,8,16 --duration 30 --out load.json
+
+Starts the stand-in and ``streamlit run app.py`` as separate processes and
+connects N simulated browser sessions to the app over Streamlit's own
+websocket protocol. Each session keeps clicking "Translate", "Translate
+File" or "Translate Column" with fresh corpus inputs, the way the frontend
+does: by sending its widget values and waiting for the script run to end.
+A session count is driven for --duration seconds before moving to the next.
+
+For each session count the report has per-action latency percentiles,
+completed actions per second and the app process's CPU use and peak RSS;
+last comes the session count after which throughput stopped growing.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+try:
+    import websockets
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.Common_pb2 import FileUploaderState, UploadedFileInfo
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+    WEBSOCKETS_AVAILABLE = True
+except Exception as e:
+    WEBSOCKETS_AVAILABLE = False
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except Exception as e:
+    PSUTIL_AVAILABLE = False
+
+import pandas as pd
+import requests
+
+import corpus
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ACTIONS = {"translate": 0.6, "file": 0.2, "column": 0.2}
+# Throughput has saturated once the next session count adds less than this share
+SATURATION_GAIN = 0.1
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{process.args[1]} exited with status {process.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"nothing listening on port {port} after {timeout}s")
+
+
+def process_usage(pid):
+    """(CPU seconds, RSS bytes) of a process."""
+    if PSUTIL_AVAILABLE:
+        process = psutil.Process(pid)
+        times = process.cpu_times()
+        return times.user + times.system, process.memory_info().rss
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    with open(f"/proc/{pid}/statm") as f:
+        rss_pages = int(f.read().split()[1])
+    ticks = os.sysconf("SC_CLK_TCK")
+    return (int(fields[11]) + int(fields[12])) / ticks, rss_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def percentile(samples, q):
+    if not samples:
+        return None
+    samples = sorted(samples)
+    return round(samples[min(len(samples) - 1, int(len(samples) * q / 100))], 4)
+
+
+# ---------------- Simulated browser session -----------------
+class Session:
+    """One browser tab on the app, speaking the Streamlit websocket protocol."""
+
+    def __init__(self, url, seed, timeout):
+        self.url = url
+        self.rng = random.Random(seed)
+        self.timeout = timeout
+        self.session_id = None
+        self.widgets = {}
+        self.values = {}
+        self.failed = False
+        self._ws = None
+        self._requests = 0
+
+    async def connect(self):
+        ws_url = self.url.replace("http", "ws", 1) + "/_stcore/stream"
+        self._ws = await websockets.connect(ws_url, subprotocols=["streamlit"], max_size=None)
+        await self.rerun()
+
+    async def close(self):
+        await self._ws.close()
+
+    async def _receive(self):
+        message = ForwardMsg()
+        message.ParseFromString(await asyncio.wait_for(self._ws.recv(), self.timeout))
+        return message
+
+    async def rerun(self, trigger=None):
+        """Send the widget values (plus a button click) and wait for the script run to finish."""
+        back = BackMsg()
+        back.rerun_script.SetInParent()
+        states = back.rerun_script.widget_states.widgets
+        # Widget ids depend on the widgets' parameters, so values are kept by label
+        for label, value in self.values.items():
+            if label in self.widgets:
+                states.add(id=self.widgets[label], **value)
+        if trigger:
+            states.add(id=self.widgets[trigger], trigger_value=True)
+        await self._ws.send(back.SerializeToString())
+
+        widgets, failed = {}, False
+        while True:
+            message = await self._receive()
+            kind = message.WhichOneof("type")
+            if kind == "new_session":
+                self.session_id = message.new_session.initialize.session_id
+            elif kind == "delta" and message.delta.WhichOneof("type") == "new_element":
+                element = message.delta.new_element
+                name = element.WhichOneof("type")
+                if name == "exception":
+                    failed = True
+                proto = getattr(element, name)
+                if getattr(proto, "id", "") and getattr(proto, "label", ""):
+                    widgets[proto.label] = proto.id
+            elif kind == "script_finished" and message.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                break
+        self.widgets = widgets
+        self.failed = failed
+
+    async def upload(self, name, data, mime):
+        """Upload a file the way the frontend does, then select it in the file uploader."""
+        self._requests += 1
+        back = BackMsg()
+        back.file_urls_request.request_id = str(self._requests)
+        back.file_urls_request.file_names.append(name)
+        back.file_urls_request.session_id = self.session_id
+        await self._ws.send(back.SerializeToString())
+        while True:
+            message = await self._receive()
+            if message.WhichOneof("type") == "file_urls_response":
+                urls = message.file_urls_response.file_urls[0]
+                break
+        response = await asyncio.to_thread(
+            requests.put, self.url + urls.upload_url, files={"file": (name, io.BytesIO(data), mime)}
+        )
+        response.raise_for_status()
+        info = UploadedFileInfo(name=name, size=len(data), file_id=urls.file_id)
+        info.file_urls.CopyFrom(urls)
+        self.values["Upload file"] = {"file_uploader_state_value": FileUploaderState(uploaded_file_info=[info])}
+        await self.rerun()
+
+    async def act(self, args):
+        """One random user action; returns (action, seconds or None if it never ran, ok)."""
+        action = self.rng.choices(list(ACTIONS), weights=list(ACTIONS.values()))[0]
+        seed = self.rng.randrange(2**32)
+        if action == "translate":
+            self.values["Upload file"] = {"file_uploader_state_value": FileUploaderState()}
+            text = " ".join(corpus.make_cells(self.rng.randint(1, 4), seed=seed))
+            self.values["Enter text to translate"] = {"string_value": text}
+            await self.rerun()
+            button, result = "Translate", "Translation"
+        elif action == "file":
+            document = corpus.make_document(args.paragraphs, seed=seed)
+            await self.upload("document.txt", document.encode(), "text/plain")
+            button, result = "Translate File", "Download Translation"
+        else:
+            cells = corpus.make_cells(args.rows, dup=0.5, null_rate=0.02, noise_rate=0.1, seed=seed)
+            data = pd.DataFrame({"id": range(len(cells)), "text": cells}).to_csv(index=False)
+            await self.upload("rows.csv", data.encode(), "text/csv")
+            self.values["Select column to translate"] = {"string_value": "text"}
+            button, result = "Translate Column", "Download CSV"
+        if button not in self.widgets:
+            # The app failed before it drew the button
+            return action, None, False
+        start = time.perf_counter()
+        await self.rerun(trigger=button)
+        return action, time.perf_counter() - start, not self.failed and result in self.widgets
+
+
+# ---------------- Load levels -----------------
+async def run_level(sessions, args, url, pid):
+    """Drive ``sessions`` concurrent sessions for args.duration seconds."""
+    users = [Session(url, f"{args.seed}:{sessions}:{n}", args.timeout) for n in range(sessions)]
+    await asyncio.gather(*(user.connect() for user in users))
+    for user in users:
+        user.values["Source Language"] = {"string_value": args.source}
+        user.values["Target Language"] = {"string_value": args.target}
+    await asyncio.gather(*(user.rerun() for user in users))
+
+    timings = defaultdict(list)
+    errors = defaultdict(int)
+    deadline = time.monotonic() + args.duration
+
+    async def drive(user):
+        while time.monotonic() < deadline:
+            try:
+                action, seconds, ok = await user.act(args)
+            except Exception as e:
+                print(f"session error: {e!r}", file=sys.stderr)
+                errors["session"] += 1
+                return
+            if seconds is not None:
+                timings[action].append(seconds)
+            errors[action] += not ok
+
+    cpu, peak = process_usage(pid) if pid else (0.0, 0)
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(drive(user)) for user in users]
+    while not all(task.done() for task in tasks):
+        await asyncio.sleep(0.5)
+        if pid:
+            peak = max(peak, process_usage(pid)[1])
+    elapsed = time.perf_counter() - start
+    cpu = process_usage(pid)[0] - cpu if pid else None
+    await asyncio.gather(*(user.close() for user in users), return_exceptions=True)
+
+    completed = sum(len(samples) for samples in timings.values())
+    return {
+        "sessions": sessions,
+        "seconds": round(elapsed, 2),
+        "actions": completed,
+        "actions_per_s": round(completed / elapsed, 3),
+        "cpu_percent": round(100 * cpu / elapsed, 1) if pid else None,
+        "rss_mb": round(peak / 2**20, 1) if pid else None,
+        "session_errors": errors["session"],
+        "per_action": {
+            action: {
+                "count": len(timings[action]),
+                "errors": errors[action],
+                "p50": percentile(timings[action], 50),
+                "p95": percentile(timings[action], 95),
+                "p99": percentile(timings[action], 99),
+            }
+            for action in ACTIONS
+            if action in errors
+        },
+    }
+
+
+def saturation(levels):
+    """The session count after which more sessions stopped adding throughput (None if they never did)."""
+    for before, after in zip(levels, levels[1:]):
+        if after["actions_per_s"] < before["actions_per_s"] * (1 + SATURATION_GAIN):
+            return before["sessions"]
+    return None
+
+
+def start_processes(args):
+    """Start the stand-in and the app; returns (processes, app url)."""
+    standin_port, app_port = free_port(), free_port()
+    standin = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "standin.py"), "--port", str(standin_port),
+         "--latency", args.latency, "--error-rate", str(args.error_rate), "--seed", str(args.seed)],
+        stdout=subprocess.DEVNULL,
+    )
+    env = dict(
+        os.environ,
+        TRANSLATOR_GOOGLE_URL=f"http://127.0.0.1:{standin_port}/m",
+        TRANSLATOR_LIBRE_URL=f"http://127.0.0.1:{standin_port}/",
+        TRANSLATOR_TM_PATH=os.path.join(tempfile.mkdtemp(prefix="translator-load-"), "tm.sqlite3"),
+    )
+    app = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", os.path.join(HERE, "app.py"),
+         "--server.headless", "true", "--server.port", str(app_port),
+         # The simulated sessions have no browser cookies to carry an XSRF token
+         "--server.enableXsrfProtection", "false", "--browser.gatherUsageStats", "false"],
+        env=env, cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    wait_for_port(standin_port, standin)
+    wait_for_port(app_port, app)
+    return (standin, app), f"http://127.0.0.1:{app_port}"
+
+
+def _list(value):
+    return [int(v) for v in value.split(",") if v]
+
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=_list, default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--duration", type=float, default=30, help="seconds per session count")
+    parser.add_argument("--source", default="Auto-detect", help="source language as shown in the app")
+    parser.add_argument("--target", default="Urdu", help="target language as shown in the app")
+    parser.add_argument("--rows", type=int, default=500, help="rows per uploaded CSV")
+    parser.add_argument("--paragraphs", type=int, default=20, help="paragraphs per uploaded .txt")
+    parser.add_argument("--latency", default="lognormal:0.1,0.5", help="stand-in latency spec")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=300, help="longest a single action may take")
+    parser.add_argument("--url", help="load an app that is already running instead of starting one")
+    parser.add_argument("--pid", type=int, help="with --url: the app's process id, for CPU and RSS")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write results as JSON here (default: stdout)")
+    args = parser.parse_args(argv)
+    if not WEBSOCKETS_AVAILABLE:
+        parser.error("needs the websockets package and streamlit installed")
+
+    processes = ()
+    if args.url:
+        url, pid = args.url.rstrip("/"), args.pid
+    else:
+        processes, url = start_processes(args)
+        pid = processes[1].pid
+    try:
+        levels = []
+        for sessions in args.sessions:
+            level = await run_level(sessions, args, url, pid)
+            levels.append(level)
+            timing = "  ".join(
+                f"{action} p50={stats['p50']}s p95={stats['p95']}s" for action, stats in level["per_action"].items()
+            )
+            usage = f"cpu {level['cpu_percent']}%  rss {level['rss_mb']} MB  " if pid else ""
+            print(f"{sessions:>3} sessions  {level['actions_per_s']:>7.2f} actions/s  {usage}{timing}", file=sys.stderr)
+    finally:
+        for process in processes:
+            process.terminate()
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "cpus": os.cpu_count(),
+            "duration": args.duration,
+            "rows": args.rows,
+            "paragraphs": args.paragraphs,
+            "latency": args.latency,
+            "error_rate": args.error_rate,
+            "seed": args.seed,
+        },
+        "levels": levels,
+        "saturates_at": saturation(levels),
+    }
+    if report["saturates_at"]:
+        print(f"Throughput stops growing after {report['saturates_at']} sessions", file=sys.stderr)
+    else:
+        print(f"Throughput still growing at {args.sessions[-1]} sessions", file=sys.stderr)
+    data = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(data + "\n")
+    else:
+        print(data)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
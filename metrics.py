@@ -0,0 +1,241 @@
+# metrics.py
+"""Prometheus metrics for translation traffic, on a scrape endpoint next to the app.
+
+    TRANSLATOR_METRICS_PORT=9464 streamlit run app.py
+    curl http://127.0.0.1:9464/metrics
+
+The endpoint is started once per process by app.py and serves the text
+exposition format. An empty TRANSLATOR_METRICS_PORT turns it off; if the
+port is already taken (another app process on the same host), that process
+runs without one.
+"""
+import math
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_HOST = os.environ.get("TRANSLATOR_METRICS_HOST", "0.0.0.0")
+METRICS_PORT = os.environ.get("TRANSLATOR_METRICS_PORT", "9464")
+
+# Seconds; backend round trips range from a cache-warm LAN hop to a slow 10s timeout
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REGISTRY = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+class Metric:
+    """A named family of samples, one per combination of label values.
+
+    Either updated in place through labels(...).inc() and friends, or, with
+    ``fn``, read at scrape time from a function returning a number (no
+    labels) or a dict of label-value tuples to numbers.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name, help, labels=(), fn=None):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.fn = fn
+        self._children = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def labels(self, *values):
+        if len(values) != len(self.label_names):
+            raise ValueError(f"{self.name} takes labels {self.label_names}, got {values}")
+        key = tuple(str(v) for v in values)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = self._child()
+        return child
+
+    def _child(self):
+        return _Value(self._lock)
+
+    def samples(self):
+        if self.fn is not None:
+            values = self.fn()
+            if not isinstance(values, dict):
+                values = {(): values}
+            return [(self.name, key, (), value) for key, value in sorted(values.items())]
+        with self._lock:
+            return [(self.name, key, (), child.value) for key, child in sorted(self._children.items())]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for name, key, extra, value in self.samples():
+            lines.append(f"{name}{_labels(self.label_names, key, extra)} {_number(value)}")
+        return "\n".join(lines)
+
+    # Unlabelled metrics are updated directly
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def dec(self, amount=1):
+        self.labels().dec(amount)
+
+    def set(self, value):
+        self.labels().set(value)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+
+class _Value:
+    def __init__(self, lock):
+        self.value = 0.0
+        self._lock = lock
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value):
+        with self._lock:
+            self.value = value
+
+
+class Counter(Metric):
+    kind = "counter"
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+
+class _Buckets:
+    def __init__(self, lock, bounds):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = lock
+
+    def observe(self, value):
+        with self._lock:
+            for i, bound in enumerate(self.bounds):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+            self.sum += value
+            self.count += 1
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.bounds = tuple(sorted(buckets)) + (math.inf,)
+
+    def _child(self):
+        return _Buckets(self._lock, self.bounds)
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, child in sorted(self._children.items()):
+                cumulative = 0
+                for bound, count in zip(child.bounds, child.counts):
+                    cumulative += count
+                    samples.append((self.name + "_bucket", key, (("le", _number(bound)),), cumulative))
+                samples.append((self.name + "_sum", key, (), child.sum))
+                samples.append((self.name + "_count", key, (), child.count))
+        return samples
+
+
+def render():
+    """Every registered metric in the Prometheus text exposition format."""
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+# ---------------- Translation traffic -----------------
+backend_calls = Counter(
+    "translator_backend_calls_total", "Requests sent to each backend, by outcome (ok or error).", ("backend", "outcome")
+)
+backend_failures = Counter(
+    "translator_backend_failures_total", "Failed backend requests, by exception type.", ("backend", "exception")
+)
+backend_latency = Histogram(
+    "translator_backend_latency_seconds", "Backend round-trip time, successes and failures alike.", ("backend",)
+)
+characters = Counter(
+    "translator_characters_total", "Characters translated by each backend (source text).", ("backend",)
+)
+fallbacks = Counter(
+    "translator_fallbacks_total",
+    "Texts served by a backend other than the preferred one (first configured; routed pick for batch traffic).",
+    ("from", "to"),
+)
+failed_texts = Counter("translator_failed_texts_total", "Texts given up on and returned as failed.", ("path",))
+queue_depth = Gauge("translator_queue_depth", "Segments of running batch jobs still waiting for a translation.")
+
+
+def observe_call(backend, text, seconds, error=None):
+    """Record one backend request; ``text`` is a string or a list of them."""
+    backend_latency.labels(backend).observe(seconds)
+    if error is not None:
+        backend_calls.labels(backend, "error").inc()
+        backend_failures.labels(backend, type(error).__name__).inc()
+        return
+    backend_calls.labels(backend, "ok").inc()
+    characters.labels(backend).inc(sum(map(len, text)) if isinstance(text, list) else len(text))
+
+
+# ---------------- Scrape endpoint -----------------
+class Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        data = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def serve(host=METRICS_HOST, port=METRICS_PORT):
+    """Start the scrape endpoint in a background thread, once per process; the server or None."""
+    global _server
+    with _server_lock:
+        if _server is None and str(port).strip():
+            try:
+                _server = ThreadingHTTPServer((host, int(port)), Handler)
+            except OSError:
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+        return _server
@@ -0,0 +1,188 @@
+# offline.py
+# In-process CPU translation ("offline" backend). Enable it by listing
+# "offline" in TRANSLATOR_BACKENDS and giving it models, either with
+# TRANSLATOR_OFFLINE_MODELS="en:de=/path/to/package,de:en=/path/..." (Argos
+# packages: a CTranslate2 model plus sentencepiece.model) or add_model().
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+try:
+    import ctranslate2
+    import sentencepiece
+    CTRANSLATE2_AVAILABLE = True
+except Exception as e:
+    CTRANSLATE2_AVAILABLE = False
+
+from backends import HTTPClient, register
+from chunking import split_edges, split_sentences, split_text
+
+OFFLINE_THREADS = int(os.environ.get("TRANSLATOR_OFFLINE_THREADS", str(os.cpu_count() or 1)))
+OFFLINE_MAX_BATCH = int(os.environ.get("TRANSLATOR_OFFLINE_MAX_BATCH", "32"))
+OFFLINE_MAX_WAIT = float(os.environ.get("TRANSLATOR_OFFLINE_MAX_WAIT", "0.01"))
+# Longest piece given to a model at once; a sentence this long stays well
+# under its max_decoding_length of 256 tokens
+OFFLINE_SENTENCE_CHARS = int(os.environ.get("TRANSLATOR_OFFLINE_SENTENCE_CHARS", "400"))
+
+
+# ---------------- Models -----------------
+class CTranslate2Model:
+    """A quantized CTranslate2 model with its SentencePiece tokenizer, run on CPU."""
+
+    def __init__(self, path, threads=OFFLINE_THREADS, compute_type="int8"):
+        model_dir = os.path.join(path, "model")
+        if not os.path.isdir(model_dir):
+            model_dir = path
+        self.translator = ctranslate2.Translator(
+            model_dir, device="cpu", intra_threads=threads, compute_type=compute_type
+        )
+        self.tokenizer = sentencepiece.SentencePieceProcessor(model_file=os.path.join(path, "sentencepiece.model"))
+
+    def translate_batch(self, texts, src, tgt):
+        # The models are trained on single sentences and cut their output
+        # short past max_decoding_length, so each text is translated a
+        # sentence at a time and put back together around its whitespace
+        pieces = [
+            [
+                split_edges(part)
+                for sentence in split_sentences(text)
+                for part in split_text(sentence, OFFLINE_SENTENCE_CHARS)
+            ]
+            for text in texts
+        ]
+        sentences = [core for text in pieces for _, core, _ in text if core]
+        if not sentences:
+            return ["".join(lead + trail for lead, _, trail in text) for text in pieces]
+        tokens = self.tokenizer.encode(sentences, out_type=str)
+        results = self.translator.translate_batch(tokens, beam_size=2)
+        translated = iter([self.tokenizer.decode(r.hypotheses[0]) for r in results])
+        return [
+            "".join(lead + (next(translated) if core else "") + trail for lead, core, trail in text) for text in pieces
+        ]
+
+
+class EchoModel:
+    """Tiny stand-in model for tests and benchmarks: tags each line with the target code."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batches = 0
+
+    def translate_batch(self, texts, src, tgt):
+        self.batches += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return ["\n".join(f"[{tgt}] {line}" for line in text.split("\n")) for text in texts]
+
+
+# ---------------- Dynamic batching -----------------
+class DynamicBatcher:
+    """Feeds one model with batches assembled from concurrent callers.
+
+    A batch closes once it holds ``max_batch`` texts or the oldest request
+    in it has waited ``max_wait`` seconds.
+    """
+
+    def __init__(self, model, src, tgt, max_batch=OFFLINE_MAX_BATCH, max_wait=OFFLINE_MAX_WAIT):
+        self.model = model
+        self.src = src
+        self.tgt = tgt
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, name=f"offline-{src}-{tgt}", daemon=True).start()
+
+    def submit(self, texts):
+        future = Future()
+        self._queue.put((list(texts), future))
+        return future
+
+    def _collect(self):
+        items = [self._queue.get()]
+        count = len(items[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while count < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            items.append(item)
+            count += len(item[0])
+        return items
+
+    def _run(self):
+        while True:
+            items = self._collect()
+            texts = [text for batch, _ in items for text in batch]
+            try:
+                translated = self.model.translate_batch(texts, self.src, self.tgt)
+            except Exception as e:
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+            start = 0
+            for batch, future in items:
+                future.set_result(translated[start:start + len(batch)])
+                start += len(batch)
+
+
+MODELS = {}
+_batchers = {}
+_lock = threading.Lock()
+
+
+def add_model(src, tgt, model):
+    """Serve src -> tgt from ``model`` (anything with translate_batch(texts, src, tgt))."""
+    with _lock:
+        MODELS[(src, tgt)] = model
+        _batchers.pop((src, tgt), None)
+
+
+def batcher(src, tgt):
+    with _lock:
+        if (src, tgt) not in _batchers:
+            _batchers[(src, tgt)] = DynamicBatcher(MODELS[(src, tgt)], src, tgt)
+        return _batchers[(src, tgt)]
+
+
+def load_models(spec):
+    for entry in filter(None, (e.strip() for e in spec.split(","))):
+        pair, path = entry.split("=", 1)
+        src, tgt = pair.split(":", 1)
+        add_model(src, tgt, CTranslate2Model(path))
+
+
+if CTRANSLATE2_AVAILABLE and os.environ.get("TRANSLATOR_OFFLINE_MODELS"):
+    load_models(os.environ["TRANSLATOR_OFFLINE_MODELS"])
+
+
+# ---------------- Client -----------------
+@register
+class OfflineClient(HTTPClient):
+    """Serves the pairs in MODELS through their dynamic batchers; nothing goes over the network."""
+
+    name = "offline"
+    http = False
+    max_chars = int(os.environ.get("TRANSLATOR_OFFLINE_MAX_CHARS", "2000"))
+    batch = True
+    max_batch = OFFLINE_MAX_BATCH
+    # Bounded by local cores, not by anyone's rate limit
+    rate_limit = 10000.0
+    concurrency = int(os.environ.get("TRANSLATOR_OFFLINE_CONCURRENCY", "64"))
+
+    @classmethod
+    def supports(cls, src, tgt):
+        return (src, tgt) in MODELS
+
+    def translate(self, text):
+        if not text.strip():
+            return text.strip()
+        return self.translate_many([text.strip()])[0]
+
+    def translate_many(self, texts):
+        return batcher(self.source, self.target).submit(texts).result()
@@ -0,0 +1,78 @@
+# ratelimit.py
+import os
+import random
+import threading
+import time
+
+BACKOFF_BASE = float(os.environ.get("TRANSLATOR_BACKOFF_BASE", "0.5"))
+BACKOFF_CAP = float(os.environ.get("TRANSLATOR_BACKOFF_CAP", "30"))
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """Exponential backoff with full jitter for the given retry attempt (0-based)."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class TokenBucket:
+    """Token bucket whose refill rate adapts to the backend's pushback.
+
+    Throttling halves the rate (down to ``min_rate``) and blocks the bucket
+    for any Retry-After the backend sent; each success adds back a
+    twentieth of ``max_rate``.
+    """
+
+    def __init__(self, rate, burst, min_rate=0.2):
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token; returns how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def succeeded(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def throttled(self, retry_after=None):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+
+class RateLimiter:
+    """One TokenBucket per (backend, source, target)."""
+
+    def __init__(self, rates, burst_seconds=2.0):
+        self.rates = rates
+        self.burst_seconds = burst_seconds
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, backend, src, tgt):
+        key = (backend, src, tgt)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    rate = self.rates[backend]
+                    bucket = self._buckets[key] = TokenBucket(rate, max(1.0, rate * self.burst_seconds))
+        return bucket
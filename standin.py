@@ -0,0 +1,243 @@
+# standin.py
+"""Local stand-in for the Google and Libre translation endpoints.
+
+Run it and point the app at it:
+
+    python standin.py --port 8765
+    TRANSLATOR_GOOGLE_URL=http://127.0.0.1:8765/m \\
+    TRANSLATOR_LIBRE_URL=http://127.0.0.1:8765/ streamlit run app.py
+
+"Translations" are deterministic: every non-blank line is prefixed with the
+target code, so line-packed batches split back exactly as they went in.
+
+Each endpoint can also be made to misbehave like the real thing, for
+benchmarks and failure drills:
+
+    python standin.py --latency lognormal:0.15,0.6 --error-rate 0.02 \\
+        --rate-limit 20 --max-chars 5000 --seed 7
+
+Latency, errors and random throttling are drawn from a generator seeded by
+--seed and the request itself, so the same workload gets the same
+responses on every run, whatever order the threads send it in.
+"""
+import argparse
+import html
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def fake_translate(text, target):
+    return "\n".join(f"[{target}] {line}" if line.strip() else line for line in text.split("\n"))
+
+
+# ---------------- Behaviour -----------------
+def latency_sampler(spec):
+    """Parse a latency spec into ``f(rng) -> seconds``.
+
+    "0.05" (constant), "uniform:lo,hi", "normal:mean,sd",
+    "lognormal:median,sigma" or "exp:mean", all in seconds.
+    """
+    kind, _, args = str(spec).partition(":")
+    if not args:
+        value = float(kind)
+        return lambda rng: value
+    a, *rest = (float(x) for x in args.split(","))
+    b = rest[0] if rest else 0.0
+    samplers = {
+        "uniform": lambda rng: rng.uniform(a, b),
+        "normal": lambda rng: max(0.0, rng.gauss(a, b)),
+        "lognormal": lambda rng: rng.lognormvariate(math.log(a), b),
+        "exp": lambda rng: rng.expovariate(1 / a),
+    }
+    if kind not in samplers:
+        raise ValueError(f"unknown latency distribution: {kind}")
+    return samplers[kind]
+
+
+class Profile:
+    """How one emulated endpoint behaves.
+
+    latency        spec for latency_sampler(), applied to every response
+    error_rate     share of requests answered with a 503
+    throttle_rate  share of requests answered with a 429, on top of rate_limit
+    rate_limit     requests per second the endpoint takes before it answers
+                   429 with Retry-After (None: unlimited)
+    max_chars      longest payload accepted; longer gets a 413
+    max_batch      most texts in one array request; more gets a 400
+    """
+
+    def __init__(
+        self,
+        latency="0",
+        error_rate=0.0,
+        throttle_rate=0.0,
+        rate_limit=None,
+        max_chars=None,
+        max_batch=None,
+        seed=0,
+    ):
+        self.latency = latency_sampler(latency)
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.max_chars = max_chars
+        self.max_batch = max_batch
+        self.seed = seed
+        self.stats = Counter()
+        self._seen = Counter()
+        self._tokens = rate_limit or 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _rng(self, key):
+        # Seeded by the request and how often it has been seen, not by arrival order
+        with self._lock:
+            self._seen[key] += 1
+            return random.Random(f"{self.seed}:{self._seen[key]}:{key}")
+
+    def _take_token(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate_limit, self._tokens + (now - self._updated) * self.rate_limit)
+            self._updated = now
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.rate_limit
+            self._tokens -= 1
+            return 0.0
+
+    def decide(self, key, chars, items=1):
+        """(delay, status, headers) for one request."""
+        rng = self._rng(key)
+        delay = self.latency(rng)
+        roll = rng.random()
+        status, headers = 200, {}
+        if self.max_chars is not None and chars > self.max_chars:
+            status = 413
+        elif self.max_batch is not None and items > self.max_batch:
+            status = 400
+        elif self.rate_limit and (wait := self._take_token()):
+            status, headers = 429, {"Retry-After": str(math.ceil(wait))}
+        elif roll < self.throttle_rate:
+            status, headers = 429, {"Retry-After": "1"}
+        elif roll < self.throttle_rate + self.error_rate:
+            status = 503
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats[status] += 1
+        return delay, status, headers
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _params(self):
+        self._batched = False
+        params = parse_qs(urlsplit(self.path).query)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            body = self.rfile.read(length).decode()
+            if self.headers.get("Content-Type", "").startswith("application/json"):
+                data = json.loads(body)
+                # Libre's q may be an array: answer with an array
+                self._batched = isinstance(data.get("q"), list)
+                for key, value in data.items():
+                    params[key] = value if isinstance(value, list) else [value]
+            else:
+                params.update(parse_qs(body))
+        return params
+
+    def _send(self, status, body, content_type, headers=None):
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _misbehave(self, endpoint, key, chars, items=1):
+        """Apply the endpoint's profile; True if an error response was sent."""
+        delay, status, headers = self.server.profiles[endpoint].decide(key, chars, items)
+        if delay:
+            time.sleep(delay)
+        if status == 200:
+            return False
+        self._send(status, json.dumps({"error": f"stand-in {status}"}), "application/json", headers)
+        return True
+
+    def do_GET(self):
+        if urlsplit(self.path).path != "/m":
+            return self._send(404, "not found", "text/plain")
+        params = self._params()
+        text, target = params.get("q", [""])[0], params.get("tl", ["en"])[0]
+        if self._misbehave("google", repr(("google", text, target)), len(text)):
+            return
+        result = fake_translate(text, target)
+        page = f'<html><body><div class="result-container">{html.escape(result)}</div></body></html>'
+        self._send(200, page, "text/html; charset=utf-8")
+
+    def do_POST(self):
+        if urlsplit(self.path).path != "/translate":
+            return self._send(404, "not found", "text/plain")
+        params = self._params()
+        target = params.get("target", ["en"])[0]
+        q = params.get("q", [""])
+        key = repr(("libre", q, target))
+        if self._misbehave("libre", key, sum(len(t) for t in q), len(q) if self._batched else 1):
+            return
+        if self._batched:
+            result = [fake_translate(t, target) for t in q]
+        else:
+            result = fake_translate(q[0], target)
+        self._send(200, json.dumps({"translatedText": result}), "application/json")
+
+
+def make_server(host="127.0.0.1", port=0, google=None, libre=None):
+    """A stand-in server; ``google`` and ``libre`` are Profiles (default: well-behaved)."""
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.profiles = {"google": google or Profile(), "libre": libre or Profile()}
+    return server
+
+
+def serve(host="127.0.0.1", port=0, google=None, libre=None):
+    """Start the stand-in in a background thread; returns the server (``server_address`` has the port)."""
+    server = make_server(host, port, google, libre)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="0", help='e.g. 0.05, "uniform:0.05,0.2", "lognormal:0.15,0.6"')
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None, help="requests per second per endpoint")
+    parser.add_argument("--max-chars", type=int, default=None)
+    parser.add_argument("--max-batch", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    behaviour = dict(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        rate_limit=args.rate_limit,
+        max_chars=args.max_chars,
+        max_batch=args.max_batch,
+        seed=args.seed,
+    )
+    server = make_server(args.host, args.port, Profile(**behaviour), Profile(**behaviour))
+    print(f"Stand-in translation server on http://{args.host}:{args.port}")
+    server.serve_forever()
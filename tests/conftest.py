@@ -0,0 +1,10 @@
+# conftest.py
+import os
+import sys
+import tempfile
+
+# The modules live at the repository root, not in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# translator opens its translation memory at import; keep it out of the checkout
+os.environ.setdefault("TRANSLATOR_TM_PATH", os.path.join(tempfile.mkdtemp(prefix="translator-tests-"), "tm.sqlite3"))
@@ -0,0 +1,49 @@
+# test_chunking.py
+import pytest
+
+from chunking import split_edges, split_sentences, split_text
+
+LATIN = "The first sentence is here. The second one follows! Is this the third? " * 20
+URDU = "یہ پہلا جملہ ہے۔ یہ دوسرا جملہ ہے۔ کیا یہ تیسرا جملہ ہے؟ " * 20
+CJK = "这是第一句话。这是第二句话！这是第三句话吗？他说：「好的。」" * 20
+PARAGRAPHS = "First paragraph, short.\n\nSecond paragraph. It has two sentences.\n\n" * 20
+
+
+@pytest.mark.parametrize("text", [LATIN, URDU, CJK, PARAGRAPHS, "x" * 500, ""])
+@pytest.mark.parametrize("limit", [7, 50, 120])
+def test_pieces_join_back_and_fit(text, limit):
+    pieces = split_text(text, limit)
+    assert "".join(pieces) == text
+    assert all(0 < len(piece) <= limit for piece in pieces)
+
+
+@pytest.mark.parametrize(
+    "text, ends",
+    [(LATIN, (". ", "! ", "? ")), (URDU, ("۔ ", "؟ ")), (CJK, ("。", "！", "？", "」"))],
+)
+def test_cuts_fall_after_sentences(text, ends):
+    for piece in split_text(text, 50)[:-1]:
+        assert piece.endswith(ends)
+
+
+def test_paragraph_breaks_come_first():
+    for piece in split_text(PARAGRAPHS, 100)[:-1]:
+        assert piece.endswith("\n\n")
+
+
+def test_unbroken_text_is_cut_at_the_limit():
+    assert split_text("x" * 25, 10) == ["x" * 10, "x" * 10, "x" * 5]
+
+
+def test_split_edges():
+    assert split_edges("  hello world \n") == ("  ", "hello world", " \n")
+
+
+@pytest.mark.parametrize("text", [LATIN, URDU, CJK, PARAGRAPHS, "no end", ""])
+def test_split_sentences_joins_back(text):
+    assert "".join(split_sentences(text)) == text
+
+
+def test_split_sentences_cuts_after_sentences_and_lines():
+    text = "One. Two!\nThree\n\n四。五！"
+    assert split_sentences(text) == ["One. ", "Two!\n", "Three\n\n", "四。", "五！"]
@@ -0,0 +1,56 @@
+# test_concurrency.py
+import pytest
+
+import concurrency
+from concurrency import AIMDController
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A monotonic clock that only moves when the test says so."""
+    now = [1000.0]
+    monkeypatch.setattr(concurrency.time, "monotonic", lambda: now[0])
+    return now
+
+
+def run(controller, clock, latency, requests):
+    for _ in range(requests):
+        controller.acquire()
+        clock[0] += latency
+        controller.release(latency)
+
+
+def test_limit_grows_while_latency_is_steady(clock):
+    controller = AIMDController(initial=4, maximum=64)
+    run(controller, clock, 0.05, 200)
+    assert controller.baseline == pytest.approx(0.05)
+    assert controller.limit > 10
+
+
+def test_baseline_follows_a_lasting_latency_shift(clock):
+    controller = AIMDController(initial=4, maximum=64)
+    run(controller, clock, 0.05, 200)
+    run(controller, clock, 0.4, 200)
+    # The new latency is the norm now, not a spike that keeps the limit down
+    assert controller.baseline == pytest.approx(0.4)
+    assert controller.limit > 10
+    assert controller.history()[-1][2] == "healthy"
+
+
+def test_lucky_first_sample_does_not_pin_the_limit(clock):
+    controller = AIMDController(initial=4, maximum=64)
+    run(controller, clock, 0.013, 1)
+    run(controller, clock, 0.055, 300)
+    assert controller.baseline == pytest.approx(0.055)
+    assert controller.limit > 10
+
+
+def test_failures_back_off_once_per_baseline(clock):
+    controller = AIMDController(initial=16, maximum=64, backoff=0.5)
+    run(controller, clock, 0.1, 20)
+    before = controller.limit
+    for _ in range(5):
+        controller.acquire()
+        controller.release(0.1, ok=False, reason="errors")
+    assert controller.limit == pytest.approx(before * 0.5)
+    assert controller.history()[-1][2] == "errors"
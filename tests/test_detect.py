@@ -0,0 +1,50 @@
+# test_detect.py
+import pytest
+
+from detect import resolve_source
+
+DETECTED = [
+    ("en", "Our office will be closed on Monday for the national holiday."),
+    ("en", "We could not deliver the parcel because nobody was at home."),
+    ("es", "Hemos recibido su reclamación y la estamos revisando con atención."),
+    ("es", "No pudimos entregar el paquete porque no había nadie en casa."),
+    ("fr", "Nous avons bien reçu votre réclamation et nous l'examinons avec attention."),
+    ("de", "Wir konnten das Paket nicht zustellen, weil niemand zu Hause war."),
+    ("ur", "ہم نے آپ کی درخواست موصول کر لی ہے اور جلد جواب دیں گے۔"),
+    ("ar", "لقد استلمنا طلبك وسنرد عليك قريبا."),
+    ("hi", "हमें आपका अनुरोध मिल गया है और हम जल्द ही जवाब देंगे।"),
+    ("zh-CN", "我们已经收到您的请求，会尽快回复。"),
+]
+
+# Languages the app does not offer: the backend is left to detect them
+UNKNOWN = [
+    ("it", "Abbiamo ricevuto il suo reclamo e lo stiamo esaminando con attenzione."),
+    ("it", "Non abbiamo potuto consegnare il pacco perché non c'era nessuno in casa."),
+    ("pt", "O nosso escritório estará fechado na segunda-feira por causa do feriado nacional."),
+    ("pt", "Não conseguimos entregar a encomenda porque não havia ninguém em casa."),
+    ("nl", "We konden het pakket niet bezorgen omdat er niemand thuis was."),
+    ("tr", "Evde kimse olmadığı için paketi teslim edemedik."),
+    ("sw", "Habari ya asubuhi, tunakukaribisha kwenye duka letu jipya."),
+    ("fi", "Tämä on lyhyt esimerkki suomenkielisestä tekstistä."),
+    ("fa", "ما درخواست شما را دریافت کردیم و به زودی پاسخ خواهیم داد."),
+    ("mr", "आम्हाला तुमची विनंती मिळाली आहे आणि आम्ही लवकरच उत्तर देऊ."),
+    ("ne", "हामीले तपाईंको अनुरोध प्राप्त गरेका छौं र छिट्टै जवाफ दिनेछौं।"),
+]
+
+
+@pytest.mark.parametrize("lang, text", DETECTED)
+def test_offered_languages_are_detected(lang, text):
+    assert resolve_source(text, "auto") == lang
+
+
+@pytest.mark.parametrize("lang, text", UNKNOWN)
+def test_other_languages_stay_auto(lang, text):
+    assert resolve_source(text, "auto") == "auto"
+
+
+def test_short_text_stays_auto():
+    assert resolve_source("Hello", "auto") == "auto"
+
+
+def test_explicit_source_is_kept():
+    assert resolve_source("Abbiamo ricevuto il suo reclamo.", "it") == "it"
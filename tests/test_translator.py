@@ -0,0 +1,38 @@
+# test_translator.py
+import sqlite3
+
+import pytest
+
+import translator
+from backends import BackendError, RateLimited
+from concurrency import AIMDController
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    controller = AIMDController(initial=4)
+    monkeypatch.setattr(translator, "concurrency", controller)
+    return controller
+
+
+def test_adaptive_returns_the_result(controller):
+    assert translator._adaptive(lambda: "ok") == "ok"
+    assert controller.in_flight == 0
+
+
+def test_adaptive_gives_none_for_backend_errors(controller):
+    def throttled():
+        raise BackendError("all backends failed") from RateLimited("429")
+
+    assert translator._adaptive(throttled) is None
+    assert controller.in_flight == 0
+    assert controller.history()[-1][2] == "throttled"
+
+
+def test_adaptive_releases_the_slot_on_unexpected_errors(controller):
+    def locked():
+        raise sqlite3.OperationalError("database is locked")
+
+    with pytest.raises(sqlite3.OperationalError):
+        translator._adaptive(locked)
+    assert controller.in_flight == 0
@@ -0,0 +1,458 @@
+# translator.py
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+from backends import CLIENTS, REQUESTS_AVAILABLE, BackendError, ClientPool, RateLimited, capable
+from cache import MemoryCache, TranslationMemory
+from cassette import from_env as load_cassette
+from chunking import split_edges, split_text
+from classify import passthrough_mask
+from concurrency import AIMDController
+from detect import resolve_source
+from health import OPEN, CircuitBreaker, LatencyTracker, by_health, route
+from metrics import Counter, Gauge, failed_texts, fallbacks, observe_call, queue_depth
+from offline import OfflineClient  # noqa: F401  registers the "offline" backend
+from ratelimit import RateLimiter, backoff_delay
+
+# Kept at module level: Streamlit re-executes app.py on every rerun, but
+# imported modules (and these caches) live for the whole process and are
+# shared by every session.
+CACHE_MAX_BYTES = int(os.environ.get("TRANSLATOR_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+TM_PATH = os.environ.get("TRANSLATOR_TM_PATH", "translation_memory.sqlite3")
+TM_MAX_ENTRIES = int(os.environ.get("TRANSLATOR_TM_MAX_ENTRIES", "200000"))
+
+hot_cache = MemoryCache(max_bytes=CACHE_MAX_BYTES)
+memory = TranslationMemory(TM_PATH, max_entries=TM_MAX_ENTRIES)
+cassette = load_cassette()
+clients = ClientPool(cassette=cassette) if REQUESTS_AVAILABLE else None
+
+# Enabled backends, in order of preference when all are healthy
+BACKENDS = tuple(
+    b.strip() for b in os.environ.get("TRANSLATOR_BACKENDS", "google,libre").split(",") if b.strip() in CLIENTS
+)
+FAILED = "❌ Translation failed. Try again later."
+
+# Short segments are packed one per line into a single request
+BATCH_SEPARATOR = "\n"
+
+DOCUMENT_WORKERS = int(os.environ.get("TRANSLATOR_DOCUMENT_WORKERS", "8"))
+BATCH_WORKERS = int(os.environ.get("TRANSLATOR_BATCH_WORKERS", "8"))
+CSV_CHUNK_ROWS = int(os.environ.get("TRANSLATOR_CSV_CHUNK_ROWS", "50000"))
+
+# Streamed CSV results live in one directory per process, removed at exit;
+# files of sessions that went away are pruned once this old (seconds)
+STREAM_MAX_AGE = float(os.environ.get("TRANSLATOR_STREAM_MAX_AGE", str(6 * 3600)))
+_stream_dir = tempfile.TemporaryDirectory(prefix="translator-stream-")
+
+# Upper bound on in-flight requests per backend, whatever the number of
+# worker threads or sessions asking for translations.
+BACKEND_CONCURRENCY = {backend: CLIENTS[backend].concurrency for backend in BACKENDS}
+_slots = {backend: threading.BoundedSemaphore(n) for backend, n in BACKEND_CONCURRENCY.items()}
+
+# Requests per second per (backend, language pair). The buckets slow down
+# on 429/5xx and recover as requests succeed again.
+RATE_LIMITS = {backend: CLIENTS[backend].rate_limit for backend in BACKENDS}
+limiter = RateLimiter(RATE_LIMITS)
+
+# Rounds a batch segment is requeued for before it is given up as failed
+RETRY_ATTEMPTS = int(os.environ.get("TRANSLATOR_RETRY_ATTEMPTS", "5"))
+
+breakers = {backend: CircuitBreaker() for backend in BACKENDS}
+# Shared by every batch job in the process, so they back off together
+concurrency = AIMDController()
+latencies = {backend: LatencyTracker() for backend in BACKENDS}
+
+# Read from the live objects at scrape time
+Counter(
+    "translator_cache_lookups_total", "Cache lookups by tier (memory or disk) and result.", ("tier", "result"),
+    fn=lambda: {
+        ("memory", "hit"): hot_cache.hits, ("memory", "miss"): hot_cache.misses,
+        ("disk", "hit"): memory.hits, ("disk", "miss"): memory.misses,
+    },
+)
+Gauge("translator_in_flight", "Batch requests in flight under the adaptive limit.", fn=lambda: concurrency.in_flight)
+Gauge("translator_concurrency_limit", "Current adaptive (AIMD) in-flight limit.", fn=lambda: int(concurrency.limit))
+Gauge(
+    "translator_breaker_open", "1 while a backend's circuit breaker refuses calls.", ("backend",),
+    fn=lambda: {(backend,): int(breaker.state == OPEN) for backend, breaker in breakers.items()},
+)
+
+# Hedging: if the first backend has not answered within this percentile of
+# its recent latency, the same text is also sent to the next backend.
+HEDGE_PERCENTILE = float(os.environ.get("TRANSLATOR_HEDGE_PERCENTILE", "95"))
+HEDGE_DEFAULT_DELAY = float(os.environ.get("TRANSLATOR_HEDGE_DEFAULT_DELAY", "1.0"))
+_hedge_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+
+
+def lookup(text, src, tgt):
+    cached = hot_cache.get(src, tgt, text)
+    if cached is not None:
+        return cached
+    cached = memory.get(src, tgt, text, backends=BACKENDS)
+    if cached is not None:
+        hot_cache.put(src, tgt, text, cached)
+    return cached
+
+
+def remember(text, src, tgt, backend, result):
+    hot_cache.put(src, tgt, text, result)
+    memory.put(src, tgt, backend, text, result)
+
+
+def payload_limit(src, tgt):
+    """Largest text every backend able to serve src -> tgt accepts, so any of them can take a fallback."""
+    return min((CLIENTS[b].max_chars for b in capable(BACKENDS, src, tgt)), default=5000)
+
+
+def batch_limit(src, tgt):
+    """Most texts every backend able to serve src -> tgt accepts in one translate_many() call."""
+    return min((CLIENTS[b].max_batch for b in capable(BACKENDS, src, tgt)), default=1)
+
+
+def candidates(src, tgt):
+    backends = capable(BACKENDS, src, tgt)
+    if not backends:
+        raise BackendError(f"no backend can translate {src} -> {tgt}")
+    return backends
+
+
+# Duration of the last backend request made on this thread, for _adaptive
+_timing = threading.local()
+
+
+def call_backend(backend, text, src, tgt):
+    """One request to one backend, through its breaker, rate limiter and concurrency cap.
+
+    ``text`` may also be a list of single-line texts, sent with the client's
+    translate_many().
+    """
+    breaker = breakers[backend]
+    if not breaker.allow():
+        raise BackendError(f"{backend}: circuit open")
+    bucket = limiter.bucket(backend, src, tgt)
+    bucket.acquire()
+    start = time.monotonic()
+    try:
+        client = clients.get(backend, src, tgt)
+        with _slots[backend]:
+            result = client.translate_many(text) if isinstance(text, list) else client.translate(text)
+    except Exception as e:
+        _timing.last = time.monotonic() - start
+        observe_call(backend, text, _timing.last, error=e)
+        if isinstance(e, RateLimited) or (getattr(e, "status", None) or 0) >= 500:
+            bucket.throttled(e.retry_after)
+        breaker.record(False)
+        raise
+    elapsed = time.monotonic() - start
+    observe_call(backend, text, elapsed)
+    _timing.last = elapsed
+    bucket.succeeded()
+    breaker.record(True)
+    latencies[backend].record(elapsed)
+    return result
+
+
+def call_backends(text, src, tgt, spread=False):
+    """Send text to each backend in turn; return (backend, result) from the first that answers.
+
+    Only backends whose capabilities cover src -> tgt are considered. They
+    are tried healthiest first, and any whose circuit breaker is open are
+    skipped without a request. With ``spread``, the first backend is
+    instead drawn in proportion to its measured throughput, which is how
+    batch jobs share the load between backends. While a cassette records
+    or replays, the order stays the deterministic health order so a replay
+    asks the same backends the recording did.
+    """
+    backends = candidates(src, tgt)
+    if spread and not cassette:
+        order = route(backends, breakers, latencies, BACKEND_CONCURRENCY, RATE_LIMITS)
+        # Spread traffic has no preferred backend: only a failed first pick is a fallback
+        first = order[0]
+    else:
+        order = by_health(backends, breakers)
+        # Counted against the configured preference, so an outage that drops
+        # the preferred backend down the health order still shows up
+        first = backends[0]
+    error = None
+    for backend in order:
+        try:
+            result = call_backend(backend, text, src, tgt)
+        except Exception as e:
+            # Keep a throttle as the cause so callers can tell it apart
+            if not isinstance(error, RateLimited):
+                error = e
+            continue
+        if backend != first:
+            fallbacks.labels(first, backend).inc()
+        return backend, result
+    raise BackendError("all backends failed") from error
+
+
+def hedged_call(text, src, tgt):
+    """Like call_backends, but races the next backend once the first one is slow.
+
+    The backup request is only sent after HEDGE_PERCENTILE of the primary's
+    observed latency has passed (or as soon as the primary fails), so it
+    fires for the slow tail rather than for every call. The first success
+    wins; a backup that has not started yet is cancelled, and a request
+    already on the wire is left to finish with its result discarded.
+    """
+    backends = candidates(src, tgt)
+    order = iter(by_health(backends, breakers))
+    futures, pending = {}, set()
+    delay = None
+    backend = next(order)
+    while backend is not None or pending:
+        if backend is not None:
+            future = _hedge_pool.submit(call_backend, backend, text, src, tgt)
+            futures[future] = backend
+            pending.add(future)
+            delay = latencies[backend].percentile(HEDGE_PERCENTILE) or HEDGE_DEFAULT_DELAY
+        done, pending = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                for other in pending:
+                    other.cancel()
+                if futures[future] != backends[0]:
+                    fallbacks.labels(backends[0], futures[future]).inc()
+                return futures[future], future.result()
+        # Nothing answered in time, or what answered failed: bring in the next backend
+        backend = next(order, None)
+        if backend is None:
+            delay = None
+    raise BackendError("all backends failed")
+
+
+def translate_text(text, src, tgt, hedge=False):
+    if not REQUESTS_AVAILABLE:
+        return "❌ requests package not installed. Check requirements.txt"
+
+    if not text.strip():
+        return ""
+
+    src = resolve_source(text, src)
+    cached = lookup(text, src, tgt)
+    if cached is not None:
+        return cached
+
+    try:
+        return _translate_uncached(text, src, tgt, hedge=hedge)
+    except BackendError:
+        failed_texts.labels("text").inc()
+        return FAILED
+
+
+def _translate_uncached(text, src, tgt, hedge=False, spread=False):
+    """Translate through the backends and remember the result; BackendError if they all failed."""
+    if hedge:
+        backend, result = hedged_call(text, src, tgt)
+    else:
+        backend, result = call_backends(text, src, tgt, spread=spread)
+    if result:
+        remember(text, src, tgt, backend, result)
+    return result
+
+
+def _pack(texts, limit, max_items):
+    batch, size = [], 0
+    for text in texts:
+        cost = len(text) + len(BATCH_SEPARATOR)
+        if batch and (size + cost > limit or len(batch) >= max_items):
+            yield batch
+            batch, size = [], 0
+        batch.append(text)
+        size += cost
+    if batch:
+        yield batch
+
+
+def _translate_packed(batch, src, tgt):
+    """Translate a packed batch in one request; None if the backend did not keep the segments apart."""
+    backend, parts = call_backends(batch, src, tgt, spread=True)
+    if parts is None:
+        return None
+    for text, part in zip(batch, parts):
+        if part.strip():
+            remember(text, src, tgt, backend, part)
+    return parts
+
+
+def _adaptive(fn, *args, **kwargs):
+    """Run one backend-bound call under the AIMD in-flight limit; None if it failed.
+
+    The controller is fed the time of the last backend request only, not the
+    rate-limiter sleeps and concurrency-cap waits around it, so queueing in
+    this process is not mistaken for backend congestion.
+    """
+    concurrency.acquire()
+    _timing.last = None
+    start = time.monotonic()
+    ok, reason = False, "errors"
+    try:
+        result = fn(*args, **kwargs)
+        ok = True
+        return result
+    except BackendError as e:
+        if isinstance(e.__cause__, RateLimited):
+            reason = "throttled"
+        return None
+    finally:
+        # Anything else propagates, but never keeps its slot on the shared controller
+        concurrency.release(_request_time(start), ok=ok, reason=None if ok else reason)
+
+
+def _request_time(start):
+    return _timing.last if _timing.last is not None else time.monotonic() - start
+
+
+def translate_batch(texts, src, tgt, workers=BATCH_WORKERS):
+    """Translate a list of strings with as few backend requests as possible.
+
+    Up to ``workers`` threads send requests, and the process-wide AIMD
+    controller decides how many are in flight at once. Results come back in
+    input order, exactly as translate_text would return them for each string.
+    Segments the backend merges or splits are retried one at a time, and
+    segments that fail are retried for up to RETRY_ATTEMPTS rounds.
+    """
+    if not REQUESTS_AVAILABLE:
+        return [translate_text(t, src, tgt) for t in texts]
+
+    if src == "auto":
+        # Detect locally and batch each language on its own; whatever stays
+        # undetected goes to the backend as "auto"
+        groups = {}
+        for i, text in enumerate(texts):
+            groups.setdefault(resolve_source(text, src), []).append(i)
+        if list(groups) != ["auto"]:
+            results = [None] * len(texts)
+            for lang, positions in groups.items():
+                translated = translate_batch([texts[i] for i in positions], lang, tgt, workers=workers)
+                for i, result in zip(positions, translated):
+                    results[i] = result
+            return results
+
+    results = [None] * len(texts)
+    pending = {}
+    for i, text in enumerate(texts):
+        if not text.strip():
+            results[i] = ""
+            continue
+        cached = lookup(text, src, tgt)
+        if cached is not None:
+            results[i] = cached
+        else:
+            pending.setdefault(text, []).append(i)
+
+    # Multi-line or oversized segments cannot share a request
+    limit = payload_limit(src, tgt)
+    packable = [t for t in pending if BATCH_SEPARATOR not in t.strip() and len(t) < limit]
+    batches = list(_pack(packable, limit, batch_limit(src, tgt)))
+    done = {}
+    queue_depth.inc(len(pending))
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            packed = pool.map(lambda b: _adaptive(_translate_packed, [t.strip() for t in b], src, tgt), batches)
+            for batch, parts in zip(batches, packed):
+                if parts is not None:
+                    done.update(zip(batch, parts))
+                    queue_depth.dec(len(batch))
+
+            # Segments that failed go back on the queue after a jittered,
+            # growing pause instead of being written out as errors
+            rest = [t for t in pending if t not in done]
+            for attempt in range(RETRY_ATTEMPTS):
+                if attempt:
+                    reopen = min(breaker.retry_in() for breaker in breakers.values())
+                    time.sleep(max(backoff_delay(attempt - 1), reopen))
+                translated = pool.map(lambda t: _adaptive(_translate_uncached, t, src, tgt, spread=True), rest)
+                for text, result in zip(rest, translated):
+                    if result is not None:
+                        done[text] = result
+                        queue_depth.dec()
+                rest = [t for t in rest if t not in done]
+                if not rest:
+                    break
+    finally:
+        queue_depth.dec(len(pending) - len(done))
+    failed_texts.labels("batch").inc(len(rest))
+    for text in rest:
+        done[text] = FAILED
+
+    for text, positions in pending.items():
+        for i in positions:
+            results[i] = done[text]
+    return results
+
+
+def translate_column(values, src, tgt, workers=BATCH_WORKERS, batch=translate_batch):
+    """Translate each distinct value once and map the results back onto the rows.
+
+    Cells with nothing to translate (blanks, numbers, IDs, emails, URLs,
+    dates) are copied through unchanged. ``batch`` is translate_batch or any
+    function with its signature, such as async_engine.translate_many.
+
+    Returns the translated Series (same index as ``values``) and a dict of
+    counts: rows, skipped (passed through) and unique (values translated).
+    """
+    skip = passthrough_mask(values).to_numpy()
+    todo = values[~skip].astype(str)
+    codes, uniques = pd.factorize(todo)
+    translated = pd.Series(batch(list(uniques), src, tgt, workers=workers), dtype=object)
+
+    result = values.astype(object).to_numpy(copy=True)
+    result[~skip] = translated.take(codes).to_numpy()
+    stats = {"rows": len(values), "skipped": int(skip.sum()), "unique": len(uniques)}
+    return pd.Series(result, index=values.index, dtype=object), stats
+
+
+def stream_output(session_id):
+    """Where a session's streamed CSV goes; one file per session, replaced by its next job.
+
+    Also prunes files nobody has written for STREAM_MAX_AGE, left behind by
+    sessions that ended.
+    """
+    now = time.time()
+    with os.scandir(_stream_dir.name) as entries:
+        for entry in entries:
+            try:
+                if now - entry.stat().st_mtime > STREAM_MAX_AGE:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                pass  # pruned by another session's job meanwhile
+    return os.path.join(_stream_dir.name, f"{session_id}.csv")
+
+
+def translate_csv_stream(
+    file, col, src, tgt, out, chunksize=CSV_CHUNK_ROWS, workers=BATCH_WORKERS, batch=translate_batch
+):
+    """Translate one column of a CSV chunk by chunk, appending rows to ``out``.
+
+    Only ``chunksize`` rows are held in memory at a time. Yields the running
+    translate_column counts after each chunk.
+    """
+    totals = {"rows": 0, "skipped": 0, "unique": 0}
+    for chunk in pd.read_csv(file, chunksize=chunksize):
+        chunk[f"{col}_translated"], stats = translate_column(
+            chunk[col], src, tgt, workers=workers, batch=batch
+        )
+        chunk.to_csv(out, header=totals["rows"] == 0, index=False)
+        for key in totals:
+            totals[key] += stats[key]
+        yield dict(totals)
+
+
+def translate_document(text, src, tgt, workers=DOCUMENT_WORKERS, batch=translate_batch):
+    """Translate text of any length.
+
+    The text is cut on paragraph and sentence boundaries into pieces that fit
+    every backend, the pieces are translated concurrently and stitched back
+    in order with the original whitespace between them.
+    """
+    edges = [split_edges(piece) for piece in split_text(text, payload_limit(src, tgt))]
+    translated = batch([content for _, content, _ in edges], src, tgt, workers=workers)
+    return "".join(lead + out + trail for (lead, _, trail), out in zip(edges, translated))